@@ -2,22 +2,128 @@
 Cleanup script to remove all AWS resources created by the deployment.
 """
 
+import argparse
+import contextlib
+import contextvars
 import sys
 import logging
-import boto3
-from botocore.exceptions import ClientError
+import queue
+import random
+from botocore.exceptions import ClientError, WaiterError
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Iterator, List, Mapping, Optional
 
-from config import get_resource_names, AWS_REGION
-from utils import print_section, print_success, print_error
+from config import get_resource_names, AWS_REGION, STATE_FILE
+from utils import aws_retry, clear_state, format_section, load_state, print_section, print_error
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+# Log records of a step whose output is being held back, if any
+_held_records: contextvars.ContextVar[Optional[List[logging.LogRecord]]] = (
+    contextvars.ContextVar("_held_records", default=None)
+)
+
+
+class _HoldBackFilter(logging.Filter):
+    """Diverts records of held-back steps into their buffer instead of the output."""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        held = _held_records.get()
+        if held is None:
+            return True
+        held.append(record)
+        return False
+
+
+class _PlainAwareFormatter(logging.Formatter):
+    """Formatter that writes records flagged as plain without the usual prefix."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        if getattr(record, "plain", False):
+            return record.getMessage()
+        return super().format(record)
+
+
+def announce(message: str) -> None:
+    """
+    Write a banner or summary line through the logging queue.
+    
+    Going through the same queue as the log records keeps it in order with
+    the step output around it.
+    
+    Args:
+        message: Text to write, without a log record prefix
+    """
+    logger.info(message, extra={"plain": True})
+
+
+@contextlib.contextmanager
+def configure_logging() -> Iterator[None]:
+    """
+    Route log records through a queue to a background stream writer.
+    
+    Cleanup logs from worker threads; the queue keeps them from blocking
+    on a slow terminal or CI log pipe. Does nothing if logging is already
+    configured, so the cleaner can set it up itself when used on its own.
+    
+    Yields:
+        None: The queue is flushed and removed again on exit
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        yield
+        return
+    
+    log_queue = queue.Queue()
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(
+        _PlainAwareFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    )
+    listener = QueueListener(log_queue, handler)
+    
+    # The listener's handler does the real formatting
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))
+    queue_handler.addFilter(_HoldBackFilter())
+    previous_level = root.level
+    root.addHandler(queue_handler)
+    root.setLevel(logging.INFO)
+    listener.start()
+    try:
+        yield
+    finally:
+        listener.stop()
+        root.removeHandler(queue_handler)
+        root.setLevel(previous_level)
+
+
+def confirm_cleanup(resource_names: Mapping[str, str]) -> bool:
+    """
+    Show the resources that will be deleted and ask for confirmation.
+    
+    Args:
+        resource_names: Names of the deployed resources
+        
+    Returns:
+        bool: True if the user confirmed the cleanup
+    """
+    parts: List[str] = [
+        "\nWARNING: This will delete the following resources:",
+        f"   - Load Balancer: {resource_names['alb']}",
+        f"   - Target Group: {resource_names['target_group']}",
+        f"   - EC2 Instance: {resource_names['instance']}",
+        f"   - Security Groups: {resource_names['security_group']}, {resource_names['alb_sg']}",
+        f"   - Key Pair: {resource_names['key_pair']}"
+    ]
+    sys.stdout.write("\n".join(parts) + "\n")
+    sys.stdout.flush()
+    
+    response = input("\nAre you sure you want to continue? (yes/no): ")
+    return response.lower() == 'yes'
+
 
 class InfrastructureCleaner:
     """Cleans up AWS resources."""
@@ -32,210 +138,508 @@ class InfrastructureCleaner:
         self.region = region
         self.resource_names = get_resource_names()
         
-        # Initialize AWS clients
-        self.ec2_client = boto3.client('ec2', region_name=region)
-        self.elb_client = boto3.client('elbv2', region_name=region)
+        # IDs recorded by the last deployment, if any
+        self.state = load_state(STATE_FILE)
+        
+        # AWS clients are created on first use from one shared session,
+        # using the pooled, adaptively-retrying config shared with deploy.
+        # Importing it here keeps boto3 out of --help and a declined prompt.
+        from modules.aws_clients import get_client_config, make_session
+        
+        self._session = make_session(region)
+        self._config = get_client_config()
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+        
+        # ARNs/IDs resolved by _discover_resources()
+        self._discovered = {}
+    
+    @property
+    def ec2_client(self):
+        """Boto3 EC2 client."""
+        return self._client('ec2')
+    
+    @property
+    def elb_client(self):
+        """Boto3 ELBv2 client."""
+        return self._client('elbv2')
+    
+    def _client(self, service_name: str):
+        """
+        Get the client for a service, creating it on first use.
+        
+        Args:
+            service_name: AWS service name
+            
+        Returns:
+            Boto3 client for the service
+        """
+        # Sessions aren't thread-safe, so serialize client creation
+        with self._clients_lock:
+            if service_name not in self._clients:
+                self._clients[service_name] = self._session.client(
+                    service_name, config=self._config
+                )
+            return self._clients[service_name]
     
     def cleanup(self, skip_confirmation: bool = False):
         """Execute the cleanup."""
+        with configure_logging():
+            self._cleanup(skip_confirmation)
+    
+    def _cleanup(self, skip_confirmation: bool):
+        """
+        Run every cleanup step, with logging already configured.
+        
+        Args:
+            skip_confirmation: Whether the caller already confirmed
+        """
         try:
-            print_section("AWS Infrastructure Cleanup")
-            
+            # Callers that skip the prompt (main) have already shown the banner
             if not skip_confirmation:
-                print("\nWARNING: This will delete the following resources:")
-                print(f"   - Load Balancer: {self.resource_names['alb']}")
-                print(f"   - Target Group: {self.resource_names['target_group']}")
-                print(f"   - EC2 Instance: {self.resource_names['instance']}")
-                print(f"   - Security Groups: {self.resource_names['security_group']}, {self.resource_names['alb_sg']}")
-                print(f"   - Key Pair: {self.resource_names['key_pair']}")
-                
-                response = input("\nAre you sure you want to continue? (yes/no): ")
-                if response.lower() != 'yes':
+                print_section("AWS Infrastructure Cleanup")
+                if not confirm_cleanup(self.resource_names):
                     print("Cleanup cancelled.")
                     return
             
-            # Step 1: Delete Load Balancer
-            self._delete_load_balancer()
+            # Look up everything to delete up front, in one concurrent pass
+            self._discover_resources()
             
-            # Step 2: Delete Target Group (wait for LB deletion)
-            time.sleep(10)  # Wait for LB to start deleting
-            self._delete_target_group()
+            # Steps 1-3: The load balancer -> target group chain and the
+            # instance termination don't depend on each other, so run them
+            # side by side and join before touching the security groups.
+            succeeded = all(self._run_concurrently(
+                self._delete_load_balancer_and_target_group,
+                self._terminate_instance
+            ))
             
-            # Step 3: Terminate EC2 Instance
-            self._terminate_instance()
+            # Steps 4-5: Security groups (which had to wait for the LB and
+            # instance) and the key pair don't depend on each other
+            succeeded = all(self._run_concurrently(
+                self._delete_security_groups, self._delete_key_pair
+            )) and succeeded
             
-            # Step 4: Delete Security Groups (wait for instance termination)
-            self._delete_security_groups()
+            if not succeeded:
+                # Keep the recorded IDs so a rerun can retry what is left
+                announce("\n✗ Cleanup finished with errors; state file kept for a retry")
+                sys.exit(1)
             
-            # Step 5: Delete Key Pair
-            self._delete_key_pair()
+            # The recorded IDs now point at deleted resources
+            clear_state(STATE_FILE)
+            self.state = {}
             
-            print_success("\nCleanup completed successfully!")
+            announce("\n✓ Cleanup completed successfully!")
             
         except Exception as e:
-            print_error(f"Cleanup failed: {e}")
+            announce(f"✗ ERROR: Cleanup failed: {e}")
             logger.exception("Cleanup failed")
             sys.exit(1)
     
-    def _delete_load_balancer(self):
-        """Delete Application Load Balancer."""
-        print_section("1. Deleting Load Balancer")
+    def _run_concurrently(self, *steps: Callable[[], bool]) -> List[bool]:
+        """
+        Run independent steps side by side, keeping each step's output together.
+        
+        The first step logs as it goes. The output of the others is held back
+        and replayed, in order, once every step before them has finished, so
+        each step's lines stay under its own banner. Every buffer is replayed
+        even if a step raises; the first exception is re-raised afterwards.
+        
+        Args:
+            *steps: Steps to run, in the order their output should appear
+            
+        Returns:
+            list: Each step's result, in the order given
+        """
+        held = [None] + [[] for _ in steps[1:]]
+        with ThreadPoolExecutor(max_workers=len(steps)) as executor:
+            futures = [
+                executor.submit(self._run_step, step, records)
+                for step, records in zip(steps, held)
+            ]
+            results = []
+            errors = []
+            for future, records in zip(futures, held):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+                for record in records or ():
+                    logging.getLogger(record.name).handle(record)
+        
+        if errors:
+            raise errors[0]
+        return results
+    
+    @staticmethod
+    def _run_step(step: Callable[[], bool], records: Optional[List[logging.LogRecord]]) -> bool:
+        """
+        Run a step, collecting its log records into records if given.
         
+        Args:
+            step: Step to run
+            records: Buffer for held-back records, or None to log live
+            
+        Returns:
+            bool: The step's result
+        """
+        token = _held_records.set(records)
         try:
-            # Find load balancer
-            response = self.elb_client.describe_load_balancers(
+            return step()
+        finally:
+            _held_records.reset(token)
+    
+    def _print_step(self, title: str):
+        """
+        Write a step banner through the logging queue.
+        
+        Args:
+            title: Step title
+        """
+        announce(format_section(title))
+    
+    def _discover_resources(self):
+        """Resolve the ARNs/IDs of every resource to delete concurrently."""
+        logger.info("Discovering resources...")
+        sg_names = [self.resource_names["security_group"], self.resource_names["alb_sg"]]
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            lb_arn = executor.submit(self._find_load_balancer)
+            tg_arn = executor.submit(self._find_target_group)
+            instance_id = executor.submit(self._find_instance)
+            sg_ids = executor.submit(self._find_security_groups, sg_names)
+        
+        self._discovered = {
+            "lb_arn": lb_arn.result(),
+            "tg_arn": tg_arn.result(),
+            "instance_id": instance_id.result(),
+            "sg_ids": sg_ids.result()
+        }
+    
+    def _find_load_balancer(self) -> Optional[str]:
+        """Get the load balancer ARN, or None if it doesn't exist."""
+        try:
+            response = aws_retry(self.elb_client.describe_load_balancers)(
                 Names=[self.resource_names["alb"]]
             )
-            
-            if not response["LoadBalancers"]:
-                print("Load balancer not found, skipping...")
-                return
-            
-            lb_arn = response["LoadBalancers"][0]["LoadBalancerArn"]
-            
-            # Delete load balancer
-            self.elb_client.delete_load_balancer(LoadBalancerArn=lb_arn)
-            print(f"✓ Deleted load balancer: {self.resource_names['alb']}")
-            
+            if response["LoadBalancers"]:
+                return response["LoadBalancers"][0]["LoadBalancerArn"]
         except ClientError as e:
-            if e.response['Error']['Code'] == 'LoadBalancerNotFound':
-                print("Load balancer not found, skipping...")
-            else:
-                logger.error(f"Failed to delete load balancer: {e}")
+            if e.response['Error']['Code'] != 'LoadBalancerNotFound':
+                logger.error(f"Failed to find load balancer: {e}")
+        return None
     
-    def _delete_target_group(self):
-        """Delete Target Group."""
-        print_section("2. Deleting Target Group")
-        
+    def _find_target_group(self) -> Optional[str]:
+        """Get the target group ARN, or None if it doesn't exist."""
         try:
-            # Find target group
-            response = self.elb_client.describe_target_groups(
+            response = aws_retry(self.elb_client.describe_target_groups)(
                 Names=[self.resource_names["target_group"]]
             )
-            
-            if not response["TargetGroups"]:
-                print("Target group not found, skipping...")
-                return
-            
-            tg_arn = response["TargetGroups"][0]["TargetGroupArn"]
-            
-            # Wait a bit more for load balancer to be fully deleted
-            print("Waiting for load balancer deletion to complete...")
-            time.sleep(20)
-            
-            # Delete target group
-            self.elb_client.delete_target_group(TargetGroupArn=tg_arn)
-            print(f"✓ Deleted target group: {self.resource_names['target_group']}")
-            
+            if response["TargetGroups"]:
+                return response["TargetGroups"][0]["TargetGroupArn"]
         except ClientError as e:
-            if e.response['Error']['Code'] == 'TargetGroupNotFound':
-                print("Target group not found, skipping...")
-            else:
-                logger.warning(f"Failed to delete target group: {e}")
-                print("Target group might still be in use. Try again in a few minutes.")
+            if e.response['Error']['Code'] != 'TargetGroupNotFound':
+                logger.error(f"Failed to find target group: {e}")
+        return None
     
-    def _terminate_instance(self):
-        """Terminate EC2 Instance."""
-        print_section("3. Terminating EC2 Instance")
+    def _find_instance(self) -> Optional[str]:
+        """Get the instance ID, or None if no live instance exists."""
+        live_states = {
+            "Name": "instance-state-name",
+            "Values": ["running", "stopped", "stopping", "pending"]
+        }
+        
+        # Prefer a direct lookup of the instance recorded at deploy time
+        instance_id = self.state.get("instance", {}).get("InstanceId")
+        if instance_id:
+            try:
+                response = aws_retry(self.ec2_client.describe_instances)(
+                    InstanceIds=[instance_id],
+                    Filters=[live_states]
+                )
+                if response["Reservations"]:
+                    return instance_id
+            except ClientError as e:
+                if e.response['Error']['Code'] != 'InvalidInstanceID.NotFound':
+                    logger.error(f"Failed to find instance {instance_id}: {e}")
         
+        # Fall back to searching by Name tag
         try:
-            # Find instance
-            response = self.ec2_client.describe_instances(
+            response = aws_retry(self.ec2_client.describe_instances)(
                 Filters=[
                     {"Name": "tag:Name", "Values": [self.resource_names["instance"]]},
-                    {"Name": "instance-state-name", "Values": ["running", "stopped", "stopping", "pending"]}
+                    live_states
                 ]
             )
+            if response["Reservations"]:
+                return response["Reservations"][0]["Instances"][0]["InstanceId"]
+        except ClientError as e:
+            logger.error(f"Failed to find instance: {e}")
+        return None
+    
+    def _find_security_groups(self, sg_names: List[str]) -> Dict[str, str]:
+        """
+        Get security group IDs by name with a single describe call.
+        
+        Args:
+            sg_names: Security group names
             
-            if not response["Reservations"]:
-                print("Instance not found, skipping...")
-                return
+        Returns:
+            dict: Mapping of group name to ID for the groups that exist
+        """
+        try:
+            response = aws_retry(self.ec2_client.describe_security_groups)(
+                Filters=[{"Name": "group-name", "Values": sg_names}]
+            )
+            return {sg["GroupName"]: sg["GroupId"] for sg in response["SecurityGroups"]}
+        except ClientError as e:
+            logger.error(f"Failed to find security groups: {e}")
+        return {}
+    
+    def _delete_load_balancer_and_target_group(self) -> bool:
+        """
+        Delete the load balancer, then its target group.
+        
+        Returns:
+            bool: True if both are gone
+        """
+        # Step 1: Delete Load Balancer
+        lb_deleted = self._delete_load_balancer()
+        
+        # Step 2: Delete Target Group (LB deletion already waited on)
+        tg_deleted = self._delete_target_group()
+        return lb_deleted and tg_deleted
+    
+    def _delete_load_balancer(self) -> bool:
+        """
+        Delete Application Load Balancer.
+        
+        Returns:
+            bool: True if the load balancer is gone
+        """
+        self._print_step("1. Deleting Load Balancer")
+        
+        lb_arn = self._discovered.get("lb_arn")
+        if not lb_arn:
+            logger.info("Load balancer not found, skipping...")
+            return True
+        
+        try:
+            # Delete load balancer
+            aws_retry(self.elb_client.delete_load_balancer)(LoadBalancerArn=lb_arn)
+            logger.info(f"✓ Deleted load balancer: {self.resource_names['alb']}")
             
-            instance_id = response["Reservations"][0]["Instances"][0]["InstanceId"]
+            # Wait until the LB is gone so the target group is released
+            logger.info("Waiting for load balancer deletion to complete...")
+            waiter = self.elb_client.get_waiter('load_balancers_deleted')
+            waiter.wait(
+                LoadBalancerArns=[lb_arn],
+                WaiterConfig={'Delay': 3, 'MaxAttempts': 60}
+            )
+            return True
             
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'LoadBalancerNotFound':
+                logger.info("Load balancer not found, skipping...")
+                return True
+            logger.error(f"Failed to delete load balancer: {e}")
+        except WaiterError as e:
+            logger.warning(f"Load balancer deletion did not complete in time: {e}")
+        return False
+    
+    def _delete_target_group(self) -> bool:
+        """
+        Delete Target Group.
+        
+        Returns:
+            bool: True if the target group is gone
+        """
+        self._print_step("2. Deleting Target Group")
+        
+        tg_arn = self._discovered.get("tg_arn")
+        if not tg_arn:
+            logger.info("Target group not found, skipping...")
+            return True
+        
+        try:
+            # Delete target group (with backoff while the LB releases it)
+            max_retries = 5
+            for attempt in range(max_retries):
+                try:
+                    aws_retry(self.elb_client.delete_target_group)(TargetGroupArn=tg_arn)
+                    logger.info(f"✓ Deleted target group: {self.resource_names['target_group']}")
+                    return True
+                except ClientError as e:
+                    if e.response['Error']['Code'] == 'ResourceInUse' and attempt < max_retries - 1:
+                        logger.info(f"Target group still in use (attempt {attempt + 1}/{max_retries})...")
+                        time.sleep(2 ** attempt + random.random())
+                    else:
+                        raise
+            
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'TargetGroupNotFound':
+                logger.info("Target group not found, skipping...")
+                return True
+            logger.warning(f"Failed to delete target group: {e}")
+            logger.info("Target group might still be in use. Try again in a few minutes.")
+            return False
+    
+    def _terminate_instance(self) -> bool:
+        """
+        Terminate EC2 Instance.
+        
+        Returns:
+            bool: True if the instance is gone
+        """
+        self._print_step("3. Terminating EC2 Instance")
+        
+        instance_id = self._discovered.get("instance_id")
+        if not instance_id:
+            logger.info("Instance not found, skipping...")
+            return True
+        
+        try:
             # Terminate instance
-            self.ec2_client.terminate_instances(InstanceIds=[instance_id])
-            print(f"✓ Terminated instance: {instance_id}")
+            aws_retry(self.ec2_client.terminate_instances)(InstanceIds=[instance_id])
+            logger.info(f"✓ Terminated instance: {instance_id}")
             
             # Wait for termination
-            print("Waiting for instance to terminate...")
+            logger.info("Waiting for instance to terminate...")
             waiter = self.ec2_client.get_waiter('instance_terminated')
-            waiter.wait(InstanceIds=[instance_id])
-            print("✓ Instance terminated")
+            waiter.wait(
+                InstanceIds=[instance_id],
+                WaiterConfig={'Delay': 5, 'MaxAttempts': 60}
+            )
+            logger.info("✓ Instance terminated")
+            return True
             
         except ClientError as e:
             logger.error(f"Failed to terminate instance: {e}")
+            return False
     
-    def _delete_security_groups(self):
-        """Delete Security Groups."""
-        print_section("4. Deleting Security Groups")
+    def _delete_security_groups(self) -> bool:
+        """
+        Delete Security Groups.
         
-        for sg_name in [self.resource_names["security_group"], self.resource_names["alb_sg"]]:
-            try:
-                # Find security group
-                response = self.ec2_client.describe_security_groups(
-                    Filters=[{"Name": "group-name", "Values": [sg_name]}]
-                )
-                
-                if not response["SecurityGroups"]:
-                    print(f"Security group '{sg_name}' not found, skipping...")
-                    continue
-                
-                sg_id = response["SecurityGroups"][0]["GroupId"]
-                
-                # Delete security group (with retry for dependencies)
-                max_retries = 5
-                for attempt in range(max_retries):
-                    try:
-                        self.ec2_client.delete_security_group(GroupId=sg_id)
-                        print(f"✓ Deleted security group: {sg_name}")
-                        break
-                    except ClientError as e:
-                        if e.response['Error']['Code'] == 'DependencyViolation' and attempt < max_retries - 1:
-                            print(f"Waiting for dependencies to clear (attempt {attempt + 1}/{max_retries})...")
-                            time.sleep(10)
-                        else:
-                            raise
-                
-            except ClientError as e:
-                if e.response['Error']['Code'] == 'InvalidGroup.NotFound':
-                    print(f"Security group '{sg_name}' not found, skipping...")
-                else:
-                    logger.warning(f"Failed to delete security group '{sg_name}': {e}")
+        Returns:
+            bool: True if both groups are gone
+        """
+        self._print_step("4. Deleting Security Groups")
+        
+        names = [self.resource_names["security_group"], self.resource_names["alb_sg"]]
+        
+        # The two groups are independent, so each backs off on its own.
+        # Each task runs in a copy of this context so held-back output
+        # stays with this step.
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._delete_one_sg, name)
+                for name in names
+            ]
+            return all([future.result() for future in futures])
     
-    def _delete_key_pair(self):
-        """Delete Key Pair."""
-        print_section("5. Deleting Key Pair")
+    def _delete_one_sg(self, sg_name: str) -> bool:
+        """
+        Delete a single security group, retrying on dependency violations.
+        
+        Args:
+            sg_name: Security group name
+            
+        Returns:
+            bool: True if the group is gone
+        """
+        sg_id = self._discovered.get("sg_ids", {}).get(sg_name)
+        if not sg_id:
+            logger.info(f"Security group '{sg_name}' not found, skipping...")
+            return True
         
         try:
-            self.ec2_client.delete_key_pair(KeyName=self.resource_names["key_pair"])
-            print(f"✓ Deleted key pair: {self.resource_names['key_pair']}")
-            print(f"Remember to manually delete the .pem file: {self.resource_names['key_pair']}.pem")
+            # Delete security group (with retry for dependencies)
+            max_retries = 5
+            for attempt in range(max_retries):
+                try:
+                    aws_retry(self.ec2_client.delete_security_group)(GroupId=sg_id)
+                    logger.info(f"✓ Deleted security group: {sg_name}")
+                    return True
+                except ClientError as e:
+                    if e.response['Error']['Code'] == 'DependencyViolation' and attempt < max_retries - 1:
+                        logger.info(f"Waiting for dependencies to clear (attempt {attempt + 1}/{max_retries})...")
+                        time.sleep(10)
+                    else:
+                        raise
+            
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'InvalidGroup.NotFound':
+                logger.info(f"Security group '{sg_name}' not found, skipping...")
+                return True
+            logger.warning(f"Failed to delete security group '{sg_name}': {e}")
+            return False
+    
+    def _delete_key_pair(self) -> bool:
+        """
+        Delete Key Pair.
+        
+        Returns:
+            bool: True if the key pair is gone
+        """
+        self._print_step("5. Deleting Key Pair")
+        
+        try:
+            aws_retry(self.ec2_client.delete_key_pair)(KeyName=self.resource_names["key_pair"])
+            logger.info(f"✓ Deleted key pair: {self.resource_names['key_pair']}")
+            logger.info(f"Remember to manually delete the .pem file: {self.resource_names['key_pair']}.pem")
+            return True
             
         except ClientError as e:
             if e.response['Error']['Code'] == 'InvalidKeyPair.NotFound':
-                print("Key pair not found, skipping...")
-            else:
-                logger.error(f"Failed to delete key pair: {e}")
+                logger.info("Key pair not found, skipping...")
+                return True
+            logger.error(f"Failed to delete key pair: {e}")
+            return False
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+    
+    Args:
+        argv: Arguments to parse (defaults to sys.argv)
+        
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Remove all AWS resources created by the deployment."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="skip the confirmation prompt"
+    )
+    return parser.parse_args(argv)
 
 
 def main():
     """Main entry point."""
-    try:
-        cleaner = InfrastructureCleaner()
-        
-        # Check for --force flag
-        skip_confirmation = '--force' in sys.argv
-        
-        cleaner.cleanup(skip_confirmation=skip_confirmation)
-        
-    except KeyboardInterrupt:
-        print("\n\nCleanup interrupted by user")
-        sys.exit(1)
-    except Exception as e:
-        print_error(f"Fatal error: {e}")
-        logger.exception("Fatal error occurred")
-        sys.exit(1)
+    args = parse_args()
+    with configure_logging():
+        try:
+            print_section("AWS Infrastructure Cleanup")
+            
+            # Confirm before setting up any AWS clients
+            if not args.force and not confirm_cleanup(get_resource_names()):
+                print("Cleanup cancelled.")
+                return
+            
+            cleaner = InfrastructureCleaner()
+            cleaner.cleanup(skip_confirmation=True)
+            
+        except KeyboardInterrupt:
+            print("\n\nCleanup interrupted by user")
+            sys.exit(1)
+        except Exception as e:
+            print_error(f"Fatal error: {e}")
+            logger.exception("Fatal error occurred")
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -8,9 +8,11 @@ This script orchestrates the deployment of:
 - Application Load Balancer with Target Group
 """
 
+import argparse
 import sys
 import logging
-import boto3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 from botocore.exceptions import ClientError
 
 # Import local modules
@@ -18,18 +20,24 @@ from config import (
     AWS_REGION,
     INSTANCE_TYPE,
     AMI_NAME_FILTER,
+    AMI_CACHE_FILE,
+    AMI_CACHE_TTL,
     get_resource_names,
     get_user_data,
     get_tags,
     INSTANCE_SG_RULES,
     ALB_SG_RULES,
+    STATE_FILE,
     TEMPLATE_NAME
 )
 from modules import (
     KeyPairManager,
     SecurityGroupManager,
     EC2InstanceManager,
-    ALBManager
+    ALBManager,
+    JSONFileCache,
+    make_clients,
+    make_session
 )
 from utils import (
     get_my_public_ip,
@@ -37,6 +45,7 @@ from utils import (
     print_resource_info,
     print_error,
     print_success,
+    save_state,
     wait_with_progress
 )
 
@@ -51,26 +60,33 @@ logger = logging.getLogger(__name__)
 class InfrastructureDeployer:
     """Manages the deployment of AWS infrastructure."""
     
-    def __init__(self, region: str = AWS_REGION):
+    def __init__(self, region: str = AWS_REGION, fresh: bool = False):
         """
         Initialize the deployer.
         
         Args:
             region: AWS region to deploy to
+            fresh: Ignore cached lookups (such as the AMI ID) from earlier runs
         """
         self.region = region
         self.resource_names = get_resource_names()
         self.tags = get_tags()
         
-        # Initialize AWS clients
-        self.ec2_client = boto3.client('ec2', region_name=region)
-        self.ec2_resource = boto3.resource('ec2', region_name=region)
-        self.elb_client = boto3.client('elbv2', region_name=region)
+        # Initialize AWS clients from one shared session
+        self._session = make_session(region)
+        clients = make_clients(region, session=self._session)
+        self.ec2_client = clients["ec2"]
+        self.elb_client = clients["elbv2"]
+        
+        # Cache of resolved AMI IDs shared with later runs
+        ami_cache = JSONFileCache(AMI_CACHE_FILE, ttl=AMI_CACHE_TTL)
+        if fresh:
+            ami_cache.clear()
         
         # Initialize managers
         self.keypair_manager = KeyPairManager(self.ec2_client)
-        self.sg_manager = SecurityGroupManager(self.ec2_client, self.ec2_resource)
-        self.instance_manager = EC2InstanceManager(self.ec2_client, self.ec2_resource)
+        self.sg_manager = SecurityGroupManager(self.ec2_client)
+        self.instance_manager = EC2InstanceManager(self.ec2_client, ami_cache=ami_cache)
         self.alb_manager = ALBManager(self.elb_client, self.ec2_client)
         
         # Store created resources
@@ -93,11 +109,9 @@ class InfrastructureDeployer:
             # Step 3: Create Security Groups
             self._create_security_groups()
             
-            # Step 4: Create EC2 Instance
-            self._create_ec2_instance()
-            
-            # Step 5: Create ALB Infrastructure
-            self._create_alb_infrastructure()
+            # Steps 4-5: Launch the instance and build the load balancer side
+            # by side, joining to register the instance and add the listener
+            self._create_instance_and_alb()
             
             # Step 6: Print Summary
             self._print_deployment_summary()
@@ -118,7 +132,8 @@ class InfrastructureDeployer:
         
         result = self.keypair_manager.create_key_pair(
             key_name=key_name,
-            save_path=key_file
+            save_path=key_file,
+            tags=self.tags
         )
         
         self.resources["key_pair"] = result
@@ -180,18 +195,39 @@ class InfrastructureDeployer:
         self.resources["alb_sg"] = alb_sg
         print_resource_info("ALB SG", alb_sg["GroupName"], alb_sg["GroupId"])
     
-    def _create_ec2_instance(self):
-        """Create EC2 instance."""
-        print_section("4. Launching EC2 Instance")
+    def _create_instance_and_alb(self):
+        """
+        Launch the EC2 instance and create the ALB concurrently.
+        
+        The instance-running wait and the load balancer provisioning are the
+        two slowest steps and don't depend on each other, so they overlap.
+        Only target registration and the listener wait for both.
+        """
+        # Both branches log their progress; results are printed once joined
+        print("\nLaunching the EC2 instance and the load balancer in parallel...")
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            instance_future = executor.submit(self._launch_instance)
+            alb_future = executor.submit(self._provision_load_balancer)
+            instance_info = instance_future.result()
+            alb_resources = alb_future.result()
+        
+        self.resources["instance"] = instance_info
+        save_state(self.resources, STATE_FILE)
+        self._print_instance_info()
+        
+        self.resources.update(alb_resources)
+        self._finish_alb_infrastructure()
+    
+    def _launch_instance(self) -> Dict[str, Any]:
+        """
+        Find the AMI and launch the EC2 instance.
         
-        # Get AMI ID
-        print("Finding latest Amazon Linux 2023 AMI...")
+        Returns:
+            dict: Instance information once it is running
+        """
         ami_id = self.instance_manager.get_ami_id(AMI_NAME_FILTER)
-        print(f"✓ Using AMI: {ami_id}")
         
-        # Create instance
-        print(f"\nLaunching {INSTANCE_TYPE} instance...")
-        instance_info = self.instance_manager.create_instance(
+        return self.instance_manager.create_instance(
             ami_id=ami_id,
             instance_type=INSTANCE_TYPE,
             key_name=self.resource_names["key_pair"],
@@ -200,38 +236,63 @@ class InfrastructureDeployer:
             instance_name=self.resource_names["instance"],
             tags=self.tags
         )
-        
-        self.resources["instance"] = instance_info
-        print_resource_info("Instance", self.resource_names["instance"], instance_info["InstanceId"])
-        print(f"  Public IP: {instance_info['PublicIpAddress']}")
-        print(f"  Private IP: {instance_info['PrivateIpAddress']}")
-        print(f"  Availability Zone: {instance_info['AvailabilityZone']}")
-        
-        print("\nWebsite is being set up (this takes ~2-3 minutes)...")
     
-    def _create_alb_infrastructure(self):
-        """Create Application Load Balancer and related resources."""
-        print_section("5. Creating Application Load Balancer")
+    def _provision_load_balancer(self) -> Dict[str, Any]:
+        """
+        Create the target group and the load balancer.
         
-        # Get VPC ID from instance
-        vpc_id = self.resources["instance"]["VpcId"]
+        The instance is launched into its security group's VPC, so that VPC
+        is known before the instance exists.
         
-        # Get all subnets
-        print("Finding subnets across all availability zones...")
+        Returns:
+            dict: Subnets, target group and load balancer information
+        """
+        vpc_id = self.resources["instance_sg"]["VpcId"]
         subnets = self.alb_manager.get_all_subnets(vpc_id)
-        print(f"✓ Found {len(subnets)} subnets")
         
-        # Create target group
-        print("\nCreating Target Group...")
         target_group = self.alb_manager.create_target_group(
             name=self.resource_names["target_group"],
             vpc_id=vpc_id,
             tags=self.tags
         )
         
-        self.resources["target_group"] = target_group
+        load_balancer = self.alb_manager.create_load_balancer(
+            name=self.resource_names["alb"],
+            security_groups=[self.resources["alb_sg"]["GroupId"]],
+            subnets=subnets,
+            tags=self.tags
+        )
+        
+        return {
+            "subnets": subnets,
+            "target_group": target_group,
+            "load_balancer": load_balancer
+        }
+    
+    def _print_instance_info(self):
+        """Print the launched EC2 instance."""
+        print_section("4. EC2 Instance")
+        
+        instance_info = self.resources["instance"]
+        print_resource_info("Instance", self.resource_names["instance"], instance_info["InstanceId"])
+        print(f"  Public IP: {instance_info['PublicIpAddress']}")
+        print(f"  Private IP: {instance_info['PrivateIpAddress']}")
+        print(f"  Availability Zone: {instance_info['AvailabilityZone']}")
+        
+        print("\nWebsite is being set up (this takes ~2-3 minutes)...")
+    
+    def _finish_alb_infrastructure(self):
+        """Print the ALB resources, then register the instance and add the listener."""
+        print_section("5. Application Load Balancer")
+        
+        print(f"✓ Found {len(self.resources['subnets'])} subnets")
+        
+        target_group = self.resources["target_group"]
         print_resource_info("Target Group", target_group["TargetGroupName"], target_group["TargetGroupArn"].split('/')[-1])
         
+        load_balancer = self.resources["load_balancer"]
+        print_resource_info("Load Balancer", load_balancer["LoadBalancerName"], load_balancer["LoadBalancerArn"].split('/')[-1])
+        
         # Register instance to target group
         print("\nRegistering instance to target group...")
         self.alb_manager.register_targets(
@@ -240,23 +301,12 @@ class InfrastructureDeployer:
         )
         print("✓ Instance registered")
         
-        # Create load balancer
-        print("\nCreating Application Load Balancer...")
-        load_balancer = self.alb_manager.create_load_balancer(
-            name=self.resource_names["alb"],
-            security_groups=[self.resources["alb_sg"]["GroupId"]],
-            subnets=subnets,
-            tags=self.tags
-        )
-        
-        self.resources["load_balancer"] = load_balancer
-        print_resource_info("Load Balancer", load_balancer["LoadBalancerName"], load_balancer["LoadBalancerArn"].split('/')[-1])
-        
         # Create listener
         print("\nCreating Listener...")
         listener = self.alb_manager.create_listener(
             load_balancer_arn=load_balancer["LoadBalancerArn"],
-            target_group_arn=target_group["TargetGroupArn"]
+            target_group_arn=target_group["TargetGroupArn"],
+            tags=self.tags
         )
         
         self.resources["listener"] = listener
@@ -266,37 +316,65 @@ class InfrastructureDeployer:
         """Print deployment summary."""
         print_section("Deployment Summary")
         
-        print("\nKey Pair:")
-        print(f"   Name: {self.resource_names['key_pair']}")
-        print(f"   File: {self.resource_names['key_pair']}.pem")
-        
-        print("\nSecurity Groups:")
-        print(f"   Instance SG: {self.resources['instance_sg']['GroupId']}")
-        print(f"   ALB SG: {self.resources['alb_sg']['GroupId']}")
-        
-        print("\nEC2 Instance:")
-        print(f"   ID: {self.resources['instance']['InstanceId']}")
-        print(f"   Type: {INSTANCE_TYPE}")
-        print(f"   Public IP: {self.resources['instance']['PublicIpAddress']}")
-        
-        print("\nLoad Balancer:")
-        print(f"   Name: {self.resources['load_balancer']['LoadBalancerName']}")
-        print(f"   DNS: {self.resources['load_balancer']['DNSName']}")
-        
-        print("\n" + "="*60)
-        print("ACCESS YOUR WEBSITE:")
-        print("="*60)
-        print(f"\n   ALB Endpoint: http://{self.resources['load_balancer']['DNSName']}")
-        print(f"   Direct Access: http://{self.resources['instance']['PublicIpAddress']}")
-        print(f"   Instance Info: http://{self.resources['load_balancer']['DNSName']}/instance-info.html")
-        print("\nNote: Allow 2-3 minutes for the website to be fully configured.")
-        print("="*60)
+        key_pair = self.resource_names['key_pair']
+        instance = self.resources['instance']
+        load_balancer = self.resources['load_balancer']
+        
+        parts: List[str] = [
+            "\nKey Pair:",
+            f"   Name: {key_pair}",
+            f"   File: {key_pair}.pem",
+            "\nSecurity Groups:",
+            f"   Instance SG: {self.resources['instance_sg']['GroupId']}",
+            f"   ALB SG: {self.resources['alb_sg']['GroupId']}",
+            "\nEC2 Instance:",
+            f"   ID: {instance['InstanceId']}",
+            f"   Type: {INSTANCE_TYPE}",
+            f"   Public IP: {instance['PublicIpAddress']}",
+            "\nLoad Balancer:",
+            f"   Name: {load_balancer['LoadBalancerName']}",
+            f"   DNS: {load_balancer['DNSName']}",
+            "\n" + "=" * 60,
+            "ACCESS YOUR WEBSITE:",
+            "=" * 60,
+            f"\n   ALB Endpoint: http://{load_balancer['DNSName']}",
+            f"   Direct Access: http://{instance['PublicIpAddress']}",
+            f"   Instance Info: http://{load_balancer['DNSName']}/instance-info.html",
+            "\nNote: Allow 2-3 minutes for the website to be fully configured.",
+            "=" * 60
+        ]
+        
+        # One write for the whole summary instead of a print per line
+        sys.stdout.write("\n".join(parts) + "\n")
+        sys.stdout.flush()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+    
+    Args:
+        argv: Arguments to parse (defaults to sys.argv)
+        
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description="Deploy the EC2 instance, security groups and load balancer."
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="ignore cached lookups (such as the AMI ID) from earlier runs"
+    )
+    return parser.parse_args(argv)
 
 
 def main():
     """Main entry point."""
+    args = parse_args()
     try:
-        deployer = InfrastructureDeployer()
+        deployer = InfrastructureDeployer(fresh=args.fresh)
         deployer.deploy()
     except KeyboardInterrupt:
         print("\n\nDeployment interrupted by user")
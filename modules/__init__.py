@@ -6,10 +6,16 @@ from .keypair import KeyPairManager
 from .security_group import SecurityGroupManager
 from .ec2_instance import EC2InstanceManager
 from .alb import ALBManager
+from ._aws_cache import JSONFileCache
+from .aws_clients import get_client_config, make_clients, make_session
 
 __all__ = [
     'KeyPairManager',
     'SecurityGroupManager',
     'EC2InstanceManager',
-    'ALBManager'
+    'ALBManager',
+    'JSONFileCache',
+    'get_client_config',
+    'make_clients',
+    'make_session'
 ]
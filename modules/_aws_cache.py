@@ -0,0 +1,193 @@
+"""
+In-process and on-disk TTL caches for AWS describe results.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# Default VPC and subnet layouts rarely change during a run
+VPC_CACHE_TTL = 300
+
+# Filter selecting the account's default VPC, built once at import
+_DEFAULT_VPC_FILTER = ({"Name": "isDefault", "Values": ("true",)},)
+
+
+class TTLCache:
+    """Dictionary cache whose entries expire after a fixed time-to-live."""
+    
+    def __init__(self, ttl: float):
+        """
+        Initialize TTLCache.
+        
+        Args:
+            ttl: Time-to-live of each entry, in seconds
+        """
+        self.ttl = ttl
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+    
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, computing and storing it on a miss.
+        
+        Exceptions raised by the factory are not cached.
+        
+        Args:
+            key: Cache key
+            factory: Callable producing the value on a miss
+        
+        Returns:
+            The cached or newly computed value
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                return entry[0]
+        
+        value = factory()
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+        return value
+    
+    def discard_if(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        """
+        Drop every entry for which predicate(key, value) is true.
+        
+        Args:
+            predicate: Callable deciding which entries to drop
+        """
+        with self._lock:
+            for key in [k for k, (v, _) in self._entries.items() if predicate(k, v)]:
+                del self._entries[key]
+    
+    def clear(self) -> None:
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+
+
+# Process-wide cache shared by every manager, keyed on (kind, region, ...)
+VPC_CACHE = TTLCache(ttl=VPC_CACHE_TTL)
+
+
+def default_vpc_id(ec2_client: Any) -> str:
+    """
+    Get the default VPC ID of the client's region.
+    
+    Every manager goes through this one lookup, so a region's default VPC
+    is described once per process however many managers ask for it.
+    
+    Args:
+        ec2_client: Boto3 EC2 client
+    
+    Returns:
+        str: Default VPC ID
+    """
+    def describe_default_vpc() -> str:
+        try:
+            response = ec2_client.describe_vpcs(Filters=list(_DEFAULT_VPC_FILTER))
+        except ClientError as e:
+            logger.error("Failed to get default VPC: %s", e)
+            raise
+        if not response["Vpcs"]:
+            raise Exception("No default VPC found")
+        vpc_id = response["Vpcs"][0]["VpcId"]
+        logger.info("Using default VPC: %s", vpc_id)
+        return vpc_id
+    
+    key = ("default_vpc", ec2_client.meta.region_name)
+    return VPC_CACHE.get_or_set(key, describe_default_vpc)
+
+
+def invalidate(vpc_id: Optional[str] = None) -> None:
+    """
+    Drop cached VPC/subnet lookups.
+    
+    Args:
+        vpc_id: Only drop entries for this VPC (drops everything if None)
+    """
+    if vpc_id is None:
+        VPC_CACHE.clear()
+    else:
+        VPC_CACHE.discard_if(lambda key, value: vpc_id in key or value == vpc_id)
+
+
+class JSONFileCache:
+    """Small on-disk cache of JSON values whose entries expire after a TTL."""
+    
+    def __init__(self, path: Path, ttl: float):
+        """
+        Initialize JSONFileCache.
+        
+        Args:
+            path: Path of the JSON cache file
+            ttl: Time-to-live of each entry, in seconds
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+    
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get an unexpired value.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            The cached value, or None on a miss or unreadable cache file
+        """
+        entry = self._read().get(key)
+        if entry and entry.get("expires", 0) > time.time():
+            return entry.get("value")
+        return None
+    
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a value, dropping entries that have expired.
+        
+        Failing to write the cache is logged and otherwise ignored.
+        
+        Args:
+            key: Cache key
+            value: JSON-serializable value
+        """
+        now = time.time()
+        entries = {
+            k: v for k, v in self._read().items()
+            if isinstance(v, dict) and v.get("expires", 0) > now
+        }
+        entries[key] = {"value": value, "expires": now + self.ttl}
+        
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Write beside the cache and swap it in so readers never see half a file
+            tmp_path = self.path.with_suffix(".tmp")
+            tmp_path.write_text(json.dumps(entries), encoding="utf-8")
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not write cache %s: %s", self.path, e)
+    
+    def clear(self) -> None:
+        """Remove the cache file."""
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+    
+    def _read(self) -> Dict[str, Any]:
+        """Read every entry, treating a missing or corrupt file as empty."""
+        try:
+            entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
@@ -0,0 +1,99 @@
+"""
+Exponential-backoff polling for resources that take a while to settle.
+"""
+
+import logging
+import time
+from typing import Any, Callable, FrozenSet, Iterator
+
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# Error codes AWS uses to signal request throttling
+THROTTLING_CODES = frozenset({
+    "Throttling",
+    "ThrottlingException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "RequestThrottled"
+})
+
+# How long a just-created resource may still be reported as not found
+NOT_FOUND_GRACE = 30.0
+
+# Default wait ceiling, matching the stock waiters it replaces (15 s x 40)
+WAIT_TIMEOUT = 600.0
+
+
+def backoff_delays(
+    initial: float = 1.0,
+    factor: float = 1.25,
+    max_delay: float = 55.0
+) -> Iterator[float]:
+    """
+    Yield an endless, capped exponential sequence of delays.
+    
+    Args:
+        initial: First delay, in seconds
+        factor: Growth factor between delays
+        max_delay: Upper bound of a single delay, in seconds
+    
+    Yields:
+        float: Next delay, in seconds
+    """
+    delay = initial
+    while True:
+        yield delay
+        delay = min(delay * factor, max_delay)
+
+
+def wait_until(
+    check: Callable[[], Any],
+    description: str,
+    timeout: float = WAIT_TIMEOUT,
+    not_found_codes: FrozenSet[str] = frozenset(),
+    not_found_grace: float = NOT_FOUND_GRACE,
+    **backoff: float
+) -> Any:
+    """
+    Poll check() with exponential backoff until it returns a truthy value.
+    
+    The first poll happens immediately, so resources that are already
+    settled return without sleeping. Throttling errors are always retried;
+    not_found_codes are only retried during the first not_found_grace
+    seconds, while a new resource may not be visible yet.
+    
+    Args:
+        check: Callable returning a truthy result once the wait is over
+        description: What is being waited for, used in messages
+        timeout: Overall time limit, in seconds
+        not_found_codes: ClientError codes meaning "not visible yet"
+        not_found_grace: How long not_found_codes are retried, in seconds
+        **backoff: Overrides for backoff_delays (initial, factor, max_delay)
+    
+    Returns:
+        The first truthy value returned by check()
+    
+    Raises:
+        TimeoutError: If check() is still falsy when the timeout elapses
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    
+    for delay in backoff_delays(**backoff):
+        try:
+            result = check()
+            if result:
+                return result
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code")
+            in_grace = time.monotonic() - start < not_found_grace
+            if code not in THROTTLING_CODES and not (code in not_found_codes and in_grace):
+                raise
+            logger.info("Still waiting for %s (%s)", description, code)
+        
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"Timed out after {timeout:.0f}s waiting for {description}")
+        time.sleep(min(delay, remaining))
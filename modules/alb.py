@@ -4,16 +4,29 @@ AWS Application Load Balancer management module.
 
 import logging
 from typing import Dict, Any, List, Optional
-import boto3
 from botocore.exceptions import ClientError
 import time
 
+from ._aws_cache import VPC_CACHE, default_vpc_id
+from ._backoff import WAIT_TIMEOUT, wait_until
+
 logger = logging.getLogger(__name__)
 
+# Errors register_targets returns while a new instance or target group settles
+REGISTER_RETRY_CODES = frozenset({"InvalidTarget", "TargetGroupNotFound"})
+
+# How long target registration keeps retrying, in seconds
+REGISTER_TIMEOUT = 60.0
+
+# Most targets an Application Load Balancer target group can hold
+MAX_TARGETS = 1000
+
 
 class ALBManager:
     """Manages AWS Application Load Balancers."""
     
+    __slots__ = ("elb_client", "ec2_client")
+    
     def __init__(self, elb_client, ec2_client):
         """
         Initialize ALBManager.
@@ -39,21 +52,25 @@ class ALBManager:
             if not vpc_id:
                 vpc_id = self._get_default_vpc()
             
-            response = self.ec2_client.describe_subnets(
-                Filters=[{"Name": "vpc-id", "Values": [vpc_id]}]
-            )
+            def describe_subnet_ids():
+                response = self.ec2_client.describe_subnets(
+                    Filters=[{"Name": "vpc-id", "Values": [vpc_id]}]
+                )
+                return tuple(subnet["SubnetId"] for subnet in response["Subnets"])
             
-            subnet_ids = [subnet["SubnetId"] for subnet in response["Subnets"]]
+            # Subnet layouts rarely change, so reuse a recent lookup
+            key = ("subnets", self.ec2_client.meta.region_name, vpc_id)
+            subnet_ids = list(VPC_CACHE.get_or_set(key, describe_subnet_ids))
             
             # Ensure we have subnets from at least 2 AZs (required for ALB)
             if len(subnet_ids) < 2:
                 raise Exception("ALB requires subnets in at least 2 availability zones")
             
-            logger.info(f"Found {len(subnet_ids)} subnets in VPC {vpc_id}")
+            logger.info("Found %s subnets in VPC %s", len(subnet_ids), vpc_id)
             return subnet_ids
             
         except ClientError as e:
-            logger.error(f"Failed to get subnets: {e}")
+            logger.error("Failed to get subnets: %s", e)
             raise
     
     def create_target_group(
@@ -78,6 +95,16 @@ class ALBManager:
             dict: Target group information
         """
         try:
+            # Reuse an existing target group instead of relying on a Duplicate error
+            existing = self._find_target_group(name)
+            if existing:
+                logger.info("Target group '%s' already exists", name)
+                return {
+                    "TargetGroupArn": existing["TargetGroupArn"],
+                    "TargetGroupName": name,
+                    "Exists": True
+                }
+            
             params = {
                 "Name": name,
                 "Protocol": protocol,
@@ -98,7 +125,7 @@ class ALBManager:
             response = self.elb_client.create_target_group(**params)
             target_group = response["TargetGroups"][0]
             
-            logger.info(f"Created target group: {name} ({target_group['TargetGroupArn']})")
+            logger.info("Created target group: %s (%s)", name, target_group['TargetGroupArn'])
             
             return {
                 "TargetGroupArn": target_group["TargetGroupArn"],
@@ -107,16 +134,19 @@ class ALBManager:
             
         except ClientError as e:
             if e.response['Error']['Code'] == 'DuplicateTargetGroupName':
-                logger.warning(f"Target group '{name}' already exists")
-                # Get existing target group
-                response = self.elb_client.describe_target_groups(Names=[name])
-                target_group = response["TargetGroups"][0]
+                # Created by someone else since the lookup above
+                logger.warning("Target group '%s' already exists", name)
+                target_group = self._find_target_group(name)
+                if target_group is None:
+                    # Deleted again before the lookup, so report the original error
+                    logger.error("Failed to create target group: %s", e)
+                    raise
                 return {
                     "TargetGroupArn": target_group["TargetGroupArn"],
                     "TargetGroupName": name,
                     "Exists": True
                 }
-            logger.error(f"Failed to create target group: {e}")
+            logger.error("Failed to create target group: %s", e)
             raise
     
     def register_targets(
@@ -127,26 +157,50 @@ class ALBManager:
         """
         Register instances to a target group.
         
+        All instances are registered in a single call, so callers should
+        pass the full batch rather than calling this once per instance.
+        
         Args:
             target_group_arn: Target group ARN
             instance_ids: List of instance IDs to register
             
         Returns:
             bool: True if successful
+        
+        Raises:
+            ValueError: If more than MAX_TARGETS instances are given
         """
-        try:
-            targets = [{"Id": instance_id} for instance_id in instance_ids]
-            
+        if len(instance_ids) > MAX_TARGETS:
+            raise ValueError(
+                f"Cannot register {len(instance_ids)} targets: "
+                f"a target group holds at most {MAX_TARGETS}"
+            )
+        
+        targets = [{"Id": instance_id} for instance_id in instance_ids]
+        
+        def register():
             self.elb_client.register_targets(
                 TargetGroupArn=target_group_arn,
                 Targets=targets
             )
+            return True
+        
+        try:
+            # A just-started instance (or just-created target group) can be
+            # rejected for a short while, so retry those errors with backoff
+            wait_until(
+                register,
+                f"{len(instance_ids)} targets to register",
+                timeout=REGISTER_TIMEOUT,
+                not_found_codes=REGISTER_RETRY_CODES,
+                not_found_grace=REGISTER_TIMEOUT
+            )
             
-            logger.info(f"Registered {len(instance_ids)} instances to target group")
+            logger.info("Registered %s instances to target group", len(instance_ids))
             return True
             
-        except ClientError as e:
-            logger.error(f"Failed to register targets: {e}")
+        except (ClientError, TimeoutError) as e:
+            logger.error("Failed to register targets: %s", e)
             return False
     
     def create_load_balancer(
@@ -169,6 +223,12 @@ class ALBManager:
             dict: Load balancer information
         """
         try:
+            # Reuse an existing load balancer instead of relying on a Duplicate error
+            existing = self._find_load_balancer(name)
+            if existing:
+                logger.info("Load balancer '%s' already exists", name)
+                return self._reuse_load_balancer(existing)
+            
             params = {
                 "Name": name,
                 "Subnets": subnets,
@@ -184,13 +244,11 @@ class ALBManager:
             response = self.elb_client.create_load_balancer(**params)
             load_balancer = response["LoadBalancers"][0]
             
-            logger.info(f"Created load balancer: {name} ({load_balancer['LoadBalancerArn']})")
+            logger.info("Created load balancer: %s (%s)", name, load_balancer['LoadBalancerArn'])
             
-            # Wait for load balancer to be active
+            # A new load balancer always starts out provisioning
             logger.info("Waiting for load balancer to be active...")
-            waiter = self.elb_client.get_waiter('load_balancer_available')
-            waiter.wait(LoadBalancerArns=[load_balancer['LoadBalancerArn']])
-            
+            self.wait_active(load_balancer['LoadBalancerArn'])
             logger.info("Load balancer is now active")
             
             return {
@@ -202,26 +260,125 @@ class ALBManager:
             
         except ClientError as e:
             if e.response['Error']['Code'] == 'DuplicateLoadBalancer':
-                logger.warning(f"Load balancer '{name}' already exists")
-                # Get existing load balancer
-                response = self.elb_client.describe_load_balancers(Names=[name])
-                lb = response["LoadBalancers"][0]
-                return {
-                    "LoadBalancerArn": lb["LoadBalancerArn"],
-                    "LoadBalancerName": name,
-                    "DNSName": lb["DNSName"],
-                    "Scheme": lb["Scheme"],
-                    "Exists": True
-                }
-            logger.error(f"Failed to create load balancer: {e}")
+                # Created by someone else since the lookup above
+                logger.warning("Load balancer '%s' already exists", name)
+                load_balancer = self._find_load_balancer(name)
+                if load_balancer is None:
+                    # Deleted again before the lookup, so report the original error
+                    logger.error("Failed to create load balancer: %s", e)
+                    raise
+                return self._reuse_load_balancer(load_balancer)
+            logger.error("Failed to create load balancer: %s", e)
             raise
     
+    def _find_target_group(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a target group by name.
+        
+        Args:
+            name: Target group name
+            
+        Returns:
+            dict: Target group description, or None if it doesn't exist
+        """
+        try:
+            response = self.elb_client.describe_target_groups(Names=[name])
+            return response["TargetGroups"][0] if response["TargetGroups"] else None
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'TargetGroupNotFound':
+                return None
+            raise
+    
+    def _find_load_balancer(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a load balancer by name.
+        
+        Args:
+            name: Load balancer name
+            
+        Returns:
+            dict: Load balancer description, or None if it doesn't exist
+        """
+        try:
+            response = self.elb_client.describe_load_balancers(Names=[name])
+            return response["LoadBalancers"][0] if response["LoadBalancers"] else None
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'LoadBalancerNotFound':
+                return None
+            raise
+    
+    def _reuse_load_balancer(self, lb: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Wait for an existing load balancer to be active before reusing it.
+        
+        Args:
+            lb: Load balancer description
+            
+        Returns:
+            dict: Load balancer information
+        """
+        # An earlier, interrupted run can leave it still provisioning
+        if lb.get("State", {}).get("Code") != "active":
+            logger.info("Waiting for load balancer to be active...")
+            lb = self.wait_active(lb["LoadBalancerArn"])
+        return self._load_balancer_info(lb, exists=True)
+    
+    @staticmethod
+    def _load_balancer_info(lb: Dict[str, Any], exists: bool) -> Dict[str, Any]:
+        """
+        Reduce a load balancer description to the fields the deployment uses.
+        
+        Args:
+            lb: Load balancer description
+            exists: Whether the load balancer existed before this run
+            
+        Returns:
+            dict: Load balancer information
+        """
+        return {
+            "LoadBalancerArn": lb["LoadBalancerArn"],
+            "LoadBalancerName": lb["LoadBalancerName"],
+            "DNSName": lb["DNSName"],
+            "Scheme": lb["Scheme"],
+            "Exists": exists
+        }
+    
+    def wait_active(self, load_balancer_arn: str, timeout: float = WAIT_TIMEOUT) -> Dict[str, Any]:
+        """
+        Wait for a load balancer to become active, backing off between polls.
+        
+        Args:
+            load_balancer_arn: Load balancer ARN
+            timeout: Overall time limit, in seconds
+            
+        Returns:
+            dict: Load balancer description from the final poll
+        """
+        def is_active():
+            response = self.elb_client.describe_load_balancers(
+                LoadBalancerArns=[load_balancer_arn]
+            )
+            lb = response["LoadBalancers"][0]
+            state = lb["State"]["Code"]
+            if state == "failed":
+                raise Exception(f"Load balancer failed to provision: {load_balancer_arn}")
+            return lb if state == "active" else None
+        
+        return wait_until(
+            is_active,
+            f"load balancer {load_balancer_arn} to be active",
+            timeout=timeout,
+            # A new load balancer can briefly be unknown to DescribeLoadBalancers
+            not_found_codes=frozenset({"LoadBalancerNotFound"})
+        )
+    
     def create_listener(
         self,
         load_balancer_arn: str,
         target_group_arn: str,
         port: int = 80,
-        protocol: str = "HTTP"
+        protocol: str = "HTTP",
+        tags: Optional[List[Dict[str, str]]] = None
     ) -> Dict[str, Any]:
         """
         Create a listener for the load balancer.
@@ -231,23 +388,29 @@ class ALBManager:
             target_group_arn: Target group ARN
             port: Listener port
             protocol: Listener protocol
+            tags: Optional tags
             
         Returns:
             dict: Listener information
         """
         try:
-            response = self.elb_client.create_listener(
-                LoadBalancerArn=load_balancer_arn,
-                Protocol=protocol,
-                Port=port,
-                DefaultActions=[{
+            params = {
+                "LoadBalancerArn": load_balancer_arn,
+                "Protocol": protocol,
+                "Port": port,
+                "DefaultActions": [{
                     "Type": "forward",
                     "TargetGroupArn": target_group_arn
                 }]
-            )
+            }
+            
+            if tags:
+                params["Tags"] = tags
+            
+            response = self.elb_client.create_listener(**params)
             
             listener = response["Listeners"][0]
-            logger.info(f"Created listener on port {port}")
+            logger.info("Created listener on port %s", port)
             
             return {
                 "ListenerArn": listener["ListenerArn"],
@@ -256,7 +419,7 @@ class ALBManager:
             }
             
         except ClientError as e:
-            logger.error(f"Failed to create listener: {e}")
+            logger.error("Failed to create listener: %s", e)
             raise
     
     def delete_load_balancer(self, load_balancer_arn: str) -> bool:
@@ -271,10 +434,10 @@ class ALBManager:
         """
         try:
             self.elb_client.delete_load_balancer(LoadBalancerArn=load_balancer_arn)
-            logger.info(f"Deleted load balancer: {load_balancer_arn}")
+            logger.info("Deleted load balancer: %s", load_balancer_arn)
             return True
         except ClientError as e:
-            logger.error(f"Failed to delete load balancer: {e}")
+            logger.error("Failed to delete load balancer: %s", e)
             return False
     
     def delete_target_group(self, target_group_arn: str) -> bool:
@@ -289,21 +452,12 @@ class ALBManager:
         """
         try:
             self.elb_client.delete_target_group(TargetGroupArn=target_group_arn)
-            logger.info(f"Deleted target group: {target_group_arn}")
+            logger.info("Deleted target group: %s", target_group_arn)
             return True
         except ClientError as e:
-            logger.error(f"Failed to delete target group: {e}")
+            logger.error("Failed to delete target group: %s", e)
             return False
     
     def _get_default_vpc(self) -> str:
-        """Get the default VPC ID."""
-        try:
-            response = self.ec2_client.describe_vpcs(
-                Filters=[{"Name": "isDefault", "Values": ["true"]}]
-            )
-            if response["Vpcs"]:
-                return response["Vpcs"][0]["VpcId"]
-            raise Exception("No default VPC found")
-        except ClientError as e:
-            logger.error(f"Failed to get default VPC: {e}")
-            raise
+        """Get the default VPC ID (cached per region)."""
+        return default_vpc_id(self.ec2_client)
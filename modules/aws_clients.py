@@ -0,0 +1,69 @@
+"""
+Shared boto3 client construction for the AWS modules.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Connection pool size, large enough for concurrent describe/delete calls
+MAX_POOL_CONNECTIONS = 50
+
+
+@lru_cache(maxsize=1)
+def get_client_config():
+    """
+    Get the botocore Config shared by every client.
+    
+    Keeps connections alive and pooled across the many describe/create
+    calls of a deployment, and retries throttling adaptively.
+    
+    Returns:
+        botocore.config.Config: Shared client configuration
+    """
+    from botocore.config import Config
+    
+    return Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        tcp_keepalive=True,
+        retries={"mode": "adaptive", "max_attempts": 10},
+        connect_timeout=3,
+        read_timeout=30
+    )
+
+
+def make_session(region: str):
+    """
+    Create a boto3 session for a region.
+    
+    Args:
+        region: AWS region
+    
+    Returns:
+        boto3.session.Session: New session
+    """
+    import boto3
+    
+    return boto3.session.Session(region_name=region)
+
+
+def make_clients(region: str, session: Optional[Any] = None) -> Dict[str, Any]:
+    """
+    Create the EC2 and ELBv2 clients from one session.
+    
+    Args:
+        region: AWS region
+        session: Optional boto3 session to build the clients from
+    
+    Returns:
+        dict: Clients keyed by service name ('ec2', 'elbv2')
+    """
+    session = session or make_session(region)
+    config = get_client_config()
+    
+    return {
+        service: session.client(service, region_name=region, config=config)
+        for service in ("ec2", "elbv2")
+    }
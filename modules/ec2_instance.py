@@ -4,25 +4,32 @@ AWS EC2 Instance management module.
 
 import logging
 from typing import Dict, Any, Optional, List
-import boto3
 from botocore.exceptions import ClientError
 
+from ._aws_cache import JSONFileCache
+from ._backoff import WAIT_TIMEOUT, wait_until
+
 logger = logging.getLogger(__name__)
 
+# States from which an instance will never become running
+FAILED_STATES = frozenset({"shutting-down", "terminated"})
+
 
 class EC2InstanceManager:
     """Manages AWS EC2 Instances."""
     
-    def __init__(self, ec2_client, ec2_resource):
+    __slots__ = ("ec2_client", "ami_cache")
+    
+    def __init__(self, ec2_client, ami_cache: Optional[JSONFileCache] = None):
         """
         Initialize EC2InstanceManager.
         
         Args:
             ec2_client: Boto3 EC2 client
-            ec2_resource: Boto3 EC2 resource
+            ami_cache: Optional cache of resolved AMI IDs
         """
         self.ec2_client = ec2_client
-        self.ec2_resource = ec2_resource
+        self.ami_cache = ami_cache
     
     def get_ami_id(self, ami_name_filter: str) -> str:
         """
@@ -31,37 +38,71 @@ class EC2InstanceManager:
         Args:
             ami_name_filter: Name filter for AMI (e.g., 'al2023-ami-*')
             
+        Returns:
+            str: AMI ID
+        """
+        if self.ami_cache is None:
+            return self._find_latest_ami(ami_name_filter)
+        
+        key = f"{self.ec2_client.meta.region_name}/amazon/{ami_name_filter}"
+        ami_id = self.ami_cache.get(key)
+        if ami_id:
+            logger.info("Using cached AMI: %s", ami_id)
+            return ami_id
+        
+        ami_id = self._find_latest_ami(ami_name_filter)
+        self.ami_cache.set(key, ami_id)
+        return ami_id
+    
+    def _find_latest_ami(self, ami_name_filter: str) -> str:
+        """
+        Look up the latest Amazon-owned AMI ID matching the filter.
+        
+        Args:
+            ami_name_filter: Name filter for AMI
+            
         Returns:
             str: AMI ID
         """
         try:
-            response = self.ec2_client.describe_images(
+            # Filter server-side and page through the results, keeping only
+            # the running latest image instead of every image description
+            paginator = self.ec2_client.get_paginator('describe_images')
+            pages = paginator.paginate(
                 Filters=[
                     {"Name": "name", "Values": [ami_name_filter]},
                     {"Name": "state", "Values": ["available"]},
-                    {"Name": "architecture", "Values": ["x86_64"]}
+                    {"Name": "architecture", "Values": ["x86_64"]},
+                    {"Name": "root-device-type", "Values": ["ebs"]},
+                    {"Name": "virtualization-type", "Values": ["hvm"]}
                 ],
-                Owners=["amazon"]
+                Owners=["amazon"],
+                IncludeDeprecated=False,
+                PaginationConfig={"PageSize": 100}
             )
             
-            if not response["Images"]:
-                raise Exception(f"No AMI found matching filter: {ami_name_filter}")
+            # Latest by creation date; ISO-8601 strings compare chronologically
+            latest = None
+            for page in pages:
+                for image in page["Images"]:
+                    if latest is None or image["CreationDate"] > latest["CreationDate"]:
+                        latest = {
+                            "ImageId": image["ImageId"],
+                            "Name": image["Name"],
+                            "CreationDate": image["CreationDate"]
+                        }
             
-            # Sort by creation date and get the latest
-            images = sorted(
-                response["Images"],
-                key=lambda x: x["CreationDate"],
-                reverse=True
-            )
+            if latest is None:
+                raise Exception(f"No AMI found matching filter: {ami_name_filter}")
             
-            ami_id = images[0]["ImageId"]
-            ami_name = images[0]["Name"]
-            logger.info(f"Found AMI: {ami_name} ({ami_id})")
+            ami_id = latest["ImageId"]
+            ami_name = latest["Name"]
+            logger.info("Found AMI: %s (%s)", ami_name, ami_id)
             
             return ami_id
             
         except ClientError as e:
-            logger.error(f"Failed to get AMI: {e}")
+            logger.error("Failed to get AMI: %s", e)
             raise
     
     def create_instance(
@@ -137,33 +178,72 @@ class EC2InstanceManager:
                     if subnets_response["Subnets"]:
                         default_subnet = subnets_response["Subnets"][0]["SubnetId"]
                         params["NetworkInterfaces"][0]["SubnetId"] = default_subnet
-                        logger.info(f"Using subnet: {default_subnet}")
+                        logger.info("Using subnet: %s", default_subnet)
                 except Exception as e:
-                    logger.warning(f"Could not find subnet: {e}")
+                    logger.warning("Could not find subnet: %s", e)
             
             # Launch instance
             response = self.ec2_client.run_instances(**params)
             instance = response["Instances"][0]
             instance_id = instance["InstanceId"]
             
-            logger.info(f"Launched instance: {instance_id}")
-            
-            # Wait for instance to be running
-            logger.info(f"Waiting for instance {instance_id} to be running...")
-            waiter = self.ec2_client.get_waiter('instance_running')
-            waiter.wait(InstanceIds=[instance_id])
+            logger.info("Launched instance: %s", instance_id)
             
-            logger.info(f"Instance {instance_id} is now running")
+            # Wait for instance to be running; the final poll carries its details
+            logger.info("Waiting for instance %s to be running...", instance_id)
+            instance_info = self.wait_running([instance_id])[instance_id]
             
-            # Get updated instance information
-            instance_info = self.get_instance_info(instance_id)
+            logger.info("Instance %s is now running", instance_id)
             
             return instance_info
             
         except ClientError as e:
-            logger.error(f"Failed to create instance: {e}")
+            logger.error("Failed to create instance: %s", e)
             raise
     
+    def wait_running(
+        self,
+        instance_ids: List[str],
+        timeout: float = WAIT_TIMEOUT
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Wait for instances to reach the running state.
+        
+        Every poll describes all of the instances in a single call, backing
+        off exponentially between polls.
+        
+        Args:
+            instance_ids: Instance IDs to wait for
+            timeout: Overall time limit, in seconds
+            
+        Returns:
+            dict: Instance information keyed by instance ID
+        """
+        def all_running():
+            # Describe directly: expected not-found polls are not failures
+            response = self.ec2_client.describe_instances(InstanceIds=list(instance_ids))
+            info = {
+                instance["InstanceId"]: self._summarize_instance(instance)
+                for reservation in response["Reservations"]
+                for instance in reservation["Instances"]
+            }
+            failed = [i for i, v in info.items() if v["State"] in FAILED_STATES]
+            if failed:
+                raise Exception(f"Instances failed to start: {', '.join(failed)}")
+            if len(info) == len(instance_ids) and all(
+                v["State"] == "running" for v in info.values()
+            ):
+                return info
+            return None
+        
+        return wait_until(
+            all_running,
+            f"instances {', '.join(instance_ids)} to be running",
+            timeout=timeout,
+            # New instance IDs can briefly be unknown to DescribeInstances
+            not_found_codes=frozenset({"InvalidInstanceID.NotFound"})
+        )
+    
     def get_instance_info(self, instance_id: str) -> Dict[str, Any]:
         """
         Get instance information.
@@ -174,25 +254,53 @@ class EC2InstanceManager:
         Returns:
             dict: Instance information
         """
+        return self.get_instances_info([instance_id])[instance_id]
+    
+    def get_instances_info(self, instance_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get information for several instances with a single describe call.
+        
+        Args:
+            instance_ids: Instance IDs
+            
+        Returns:
+            dict: Instance information keyed by instance ID
+        """
         try:
-            response = self.ec2_client.describe_instances(InstanceIds=[instance_id])
-            instance = response["Reservations"][0]["Instances"][0]
+            response = self.ec2_client.describe_instances(InstanceIds=list(instance_ids))
             
             return {
-                "InstanceId": instance_id,
-                "InstanceType": instance["InstanceType"],
-                "State": instance["State"]["Name"],
-                "PublicIpAddress": instance.get("PublicIpAddress"),
-                "PrivateIpAddress": instance.get("PrivateIpAddress"),
-                "AvailabilityZone": instance["Placement"]["AvailabilityZone"],
-                "SubnetId": instance.get("SubnetId"),
-                "VpcId": instance.get("VpcId")
+                instance["InstanceId"]: self._summarize_instance(instance)
+                for reservation in response["Reservations"]
+                for instance in reservation["Instances"]
             }
             
         except ClientError as e:
-            logger.error(f"Failed to get instance info: {e}")
+            logger.error("Failed to get instance info: %s", e)
             raise
     
+    @staticmethod
+    def _summarize_instance(instance: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Reduce a DescribeInstances entry to the fields the deployment uses.
+        
+        Args:
+            instance: Instance entry from DescribeInstances
+            
+        Returns:
+            dict: Instance information
+        """
+        return {
+            "InstanceId": instance["InstanceId"],
+            "InstanceType": instance["InstanceType"],
+            "State": instance["State"]["Name"],
+            "PublicIpAddress": instance.get("PublicIpAddress"),
+            "PrivateIpAddress": instance.get("PrivateIpAddress"),
+            "AvailabilityZone": instance["Placement"]["AvailabilityZone"],
+            "SubnetId": instance.get("SubnetId"),
+            "VpcId": instance.get("VpcId")
+        }
+    
     def terminate_instance(self, instance_id: str) -> bool:
         """
         Terminate an EC2 instance.
@@ -205,10 +313,10 @@ class EC2InstanceManager:
         """
         try:
             self.ec2_client.terminate_instances(InstanceIds=[instance_id])
-            logger.info(f"Terminated instance: {instance_id}")
+            logger.info("Terminated instance: %s", instance_id)
             return True
         except ClientError as e:
-            logger.error(f"Failed to terminate instance: {e}")
+            logger.error("Failed to terminate instance: %s", e)
             return False
     
     def get_instance_by_name(self, instance_name: str) -> Optional[Dict[str, Any]]:
@@ -230,11 +338,12 @@ class EC2InstanceManager:
             )
             
             if response["Reservations"]:
+                # The filtered describe already carries every field we need
                 instance = response["Reservations"][0]["Instances"][0]
-                return self.get_instance_info(instance["InstanceId"])
+                return self._summarize_instance(instance)
             
             return None
             
         except ClientError as e:
-            logger.error(f"Failed to get instance by name: {e}")
+            logger.error("Failed to get instance by name: %s", e)
             return None
@@ -3,8 +3,8 @@ AWS EC2 Key Pair management module.
 """
 
 import logging
-from typing import Optional, Dict, Any
-import boto3
+import os
+from typing import Optional, Dict, Any, List
 from botocore.exceptions import ClientError
 
 logger = logging.getLogger(__name__)
@@ -13,6 +13,8 @@ logger = logging.getLogger(__name__)
 class KeyPairManager:
     """Manages AWS EC2 Key Pairs."""
     
+    __slots__ = ("ec2_client",)
+    
     def __init__(self, ec2_client):
         """
         Initialize KeyPairManager.
@@ -22,13 +24,19 @@ class KeyPairManager:
         """
         self.ec2_client = ec2_client
     
-    def create_key_pair(self, key_name: str, save_path: Optional[str] = None) -> Dict[str, Any]:
+    def create_key_pair(
+        self,
+        key_name: str,
+        save_path: Optional[str] = None,
+        tags: Optional[List[Dict[str, str]]] = None
+    ) -> Dict[str, Any]:
         """
         Create a new EC2 key pair.
         
         Args:
             key_name: Name for the key pair
             save_path: Optional path to save the private key file
+            tags: Optional tags for the key pair
             
         Returns:
             dict: Key pair information including KeyPairId and KeyName
@@ -38,29 +46,40 @@ class KeyPairManager:
         """
         try:
             # Check if key pair already exists
-            try:
-                response = self.ec2_client.describe_key_pairs(KeyNames=[key_name])
-                logger.info(f"Key pair '{key_name}' already exists")
+            existing = self._find_key_pair(key_name)
+            if existing:
+                logger.info("Key pair '%s' already exists", key_name)
                 return {
-                    "KeyPairId": response["KeyPairs"][0]["KeyPairId"],
+                    "KeyPairId": existing["KeyPairId"],
                     "KeyName": key_name,
                     "Exists": True
                 }
-            except ClientError as e:
-                if e.response['Error']['Code'] != 'InvalidKeyPair.NotFound':
-                    raise
             
-            # Create new key pair
-            response = self.ec2_client.create_key_pair(KeyName=key_name)
-            logger.info(f"Created key pair: {key_name}")
+            # The private key can only be saved once, so refuse before creating
+            # the key pair rather than lose the key material afterwards
+            if save_path and os.path.exists(save_path):
+                raise FileExistsError(
+                    f"Private key file already exists: {save_path}"
+                )
+            
+            # Create new key pair, tagged in the same call
+            params = {"KeyName": key_name}
+            if tags:
+                params["TagSpecifications"] = [{
+                    "ResourceType": "key-pair",
+                    "Tags": tags
+                }]
             
-            # Save private key if path provided
+            response = self.ec2_client.create_key_pair(**params)
+            logger.info("Created key pair: %s", key_name)
+            
+            # Save private key if path provided, created owner-read-only so it
+            # is never readable by others, even briefly
             if save_path:
-                with open(save_path, 'w') as f:
+                fd = os.open(save_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o400)
+                with os.fdopen(fd, 'w') as f:
                     f.write(response['KeyMaterial'])
-                import os
-                os.chmod(save_path, 0o400)
-                logger.info(f"Saved private key to: {save_path}")
+                logger.info("Saved private key to: %s", save_path)
             
             return {
                 "KeyPairId": response["KeyPairId"],
@@ -70,9 +89,28 @@ class KeyPairManager:
             }
             
         except ClientError as e:
-            logger.error(f"Failed to create key pair: {e}")
+            logger.error("Failed to create key pair: %s", e)
             raise
     
+    def _find_key_pair(self, key_name: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a key pair by name.
+        
+        A name filter returns an empty list for a missing key pair instead of
+        raising InvalidKeyPair.NotFound.
+        
+        Args:
+            key_name: Name of the key pair
+            
+        Returns:
+            dict: Key pair description, or None if it doesn't exist
+        """
+        response = self.ec2_client.describe_key_pairs(
+            Filters=[{"Name": "key-name", "Values": [key_name]}]
+        )
+        key_pairs = response["KeyPairs"]
+        return key_pairs[0] if key_pairs else None
+    
     def delete_key_pair(self, key_name: str) -> bool:
         """
         Delete an EC2 key pair.
@@ -85,10 +123,10 @@ class KeyPairManager:
         """
         try:
             self.ec2_client.delete_key_pair(KeyName=key_name)
-            logger.info(f"Deleted key pair: {key_name}")
+            logger.info("Deleted key pair: %s", key_name)
             return True
         except ClientError as e:
-            logger.error(f"Failed to delete key pair: {e}")
+            logger.error("Failed to delete key pair: %s", e)
             return False
     
     def key_pair_exists(self, key_name: str) -> bool:
@@ -102,7 +140,6 @@ class KeyPairManager:
             bool: True if exists, False otherwise
         """
         try:
-            self.ec2_client.describe_key_pairs(KeyNames=[key_name])
-            return True
+            return self._find_key_pair(key_name) is not None
         except ClientError:
             return False
@@ -4,25 +4,26 @@ AWS Security Group management module.
 
 import logging
 from typing import List, Dict, Any, Optional
-import boto3
 from botocore.exceptions import ClientError
 
+from ._aws_cache import default_vpc_id
+
 logger = logging.getLogger(__name__)
 
 
 class SecurityGroupManager:
     """Manages AWS EC2 Security Groups."""
     
-    def __init__(self, ec2_client, ec2_resource):
+    __slots__ = ("ec2_client",)
+    
+    def __init__(self, ec2_client):
         """
         Initialize SecurityGroupManager.
         
         Args:
             ec2_client: Boto3 EC2 client
-            ec2_resource: Boto3 EC2 resource
         """
         self.ec2_client = ec2_client
-        self.ec2_resource = ec2_resource
     
     def create_security_group(
         self,
@@ -44,24 +45,20 @@ class SecurityGroupManager:
             dict: Security group information
         """
         try:
+            # Get default VPC if not specified
+            if not vpc_id:
+                vpc_id = self._get_default_vpc()
+            
             # Check if security group already exists
-            try:
-                response = self.ec2_client.describe_security_groups(
-                    GroupNames=[group_name]
-                )
-                logger.info(f"Security group '{group_name}' already exists")
+            existing = self._find_security_group(group_name, vpc_id)
+            if existing:
+                logger.info("Security group '%s' already exists", group_name)
                 return {
-                    "GroupId": response["SecurityGroups"][0]["GroupId"],
+                    "GroupId": existing["GroupId"],
                     "GroupName": group_name,
+                    "VpcId": existing["VpcId"],
                     "Exists": True
                 }
-            except ClientError as e:
-                if e.response['Error']['Code'] != 'InvalidGroup.NotFound':
-                    raise
-            
-            # Get default VPC if not specified
-            if not vpc_id:
-                vpc_id = self._get_default_vpc()
             
             # Create security group
             params = {
@@ -78,7 +75,7 @@ class SecurityGroupManager:
             
             response = self.ec2_client.create_security_group(**params)
             group_id = response["GroupId"]
-            logger.info(f"Created security group: {group_name} ({group_id})")
+            logger.info("Created security group: %s (%s)", group_name, group_id)
             
             return {
                 "GroupId": group_id,
@@ -88,9 +85,32 @@ class SecurityGroupManager:
             }
             
         except ClientError as e:
-            logger.error(f"Failed to create security group: {e}")
+            logger.error("Failed to create security group: %s", e)
             raise
     
+    def _find_security_group(self, group_name: str, vpc_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a security group by name within a VPC.
+        
+        Filters return an empty list for a missing group instead of raising
+        InvalidGroup.NotFound.
+        
+        Args:
+            group_name: Name of the security group
+            vpc_id: VPC ID
+            
+        Returns:
+            dict: Security group description, or None if it doesn't exist
+        """
+        response = self.ec2_client.describe_security_groups(
+            Filters=[
+                {"Name": "group-name", "Values": [group_name]},
+                {"Name": "vpc-id", "Values": [vpc_id]}
+            ]
+        )
+        groups = response["SecurityGroups"]
+        return groups[0] if groups else None
+    
     def add_ingress_rules(
         self,
         group_id: str,
@@ -109,33 +129,17 @@ class SecurityGroupManager:
             bool: True if successful
         """
         try:
-            permissions = []
+            permissions = [self._build_permission(rule, my_ip) for rule in rules]
             
-            for rule in rules:
-                permission = {
-                    "IpProtocol": rule["IpProtocol"],
-                    "FromPort": rule["FromPort"],
-                    "ToPort": rule["ToPort"]
-                }
-                
-                # Add description if provided
-                if "Description" in rule:
-                    permission["IpRanges"] = [{"Description": rule["Description"]}]
-                
-                # Use specific CIDR or my_ip
-                if "CidrIp" in rule:
-                    if "IpRanges" in permission:
-                        permission["IpRanges"][0]["CidrIp"] = rule["CidrIp"]
-                    else:
-                        permission["IpRanges"] = [{"CidrIp": rule["CidrIp"]}]
-                elif my_ip:
-                    cidr = f"{my_ip}/32"
-                    if "IpRanges" in permission:
-                        permission["IpRanges"][0]["CidrIp"] = cidr
-                    else:
-                        permission["IpRanges"] = [{"CidrIp": cidr}]
-                
-                permissions.append(permission)
+            # Rules that need my_ip can't be applied without it
+            skipped = permissions.count(None)
+            if skipped:
+                logger.warning(
+                    "Skipping %s rules for %s: no IP address to allow", skipped, group_id
+                )
+                permissions = [p for p in permissions if p is not None]
+            if not permissions:
+                return True
             
             # Add rules to security group
             self.ec2_client.authorize_security_group_ingress(
@@ -143,16 +147,43 @@ class SecurityGroupManager:
                 IpPermissions=permissions
             )
             
-            logger.info(f"Added {len(permissions)} ingress rules to {group_id}")
+            logger.info("Added %s ingress rules to %s", len(permissions), group_id)
             return True
             
         except ClientError as e:
             if e.response['Error']['Code'] == 'InvalidPermission.Duplicate':
-                logger.warning(f"Some rules already exist in {group_id}")
+                logger.warning("Some rules already exist in %s", group_id)
                 return True
-            logger.error(f"Failed to add ingress rules: {e}")
+            logger.error("Failed to add ingress rules: %s", e)
             return False
     
+    @staticmethod
+    def _build_permission(rule: Dict[str, Any], my_ip: Optional[str]) -> Optional[Dict[str, Any]]:
+        """
+        Build the IpPermissions entry for a rule.
+        
+        Args:
+            rule: Rule dictionary
+            my_ip: IP address to use for rules without a CidrIp
+            
+        Returns:
+            dict: Permission, or None if the rule has no CIDR to allow
+        """
+        cidr = rule.get("CidrIp") or (f"{my_ip}/32" if my_ip else None)
+        if cidr is None:
+            return None
+        
+        ip_range = {"CidrIp": cidr}
+        if "Description" in rule:
+            ip_range["Description"] = rule["Description"]
+        
+        return {
+            "IpProtocol": rule["IpProtocol"],
+            "FromPort": rule["FromPort"],
+            "ToPort": rule["ToPort"],
+            "IpRanges": [ip_range]
+        }
+    
     def delete_security_group(self, group_id: str) -> bool:
         """
         Delete a security group.
@@ -165,28 +196,17 @@ class SecurityGroupManager:
         """
         try:
             self.ec2_client.delete_security_group(GroupId=group_id)
-            logger.info(f"Deleted security group: {group_id}")
+            logger.info("Deleted security group: %s", group_id)
             return True
         except ClientError as e:
-            logger.error(f"Failed to delete security group: {e}")
+            logger.error("Failed to delete security group: %s", e)
             return False
     
     def _get_default_vpc(self) -> str:
         """
-        Get the default VPC ID.
+        Get the default VPC ID (cached per region).
         
         Returns:
             str: Default VPC ID
         """
-        try:
-            response = self.ec2_client.describe_vpcs(
-                Filters=[{"Name": "isDefault", "Values": ["true"]}]
-            )
-            if response["Vpcs"]:
-                vpc_id = response["Vpcs"][0]["VpcId"]
-                logger.info(f"Using default VPC: {vpc_id}")
-                return vpc_id
-            raise Exception("No default VPC found")
-        except ClientError as e:
-            logger.error(f"Failed to get default VPC: {e}")
-            raise
+        return default_vpc_id(self.ec2_client)
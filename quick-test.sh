@@ -46,7 +46,7 @@ echo "=========================================="
 echo "  Running tests with pytest + coverage..."
 echo "=========================================="
 echo ""
-pytest test_*.py -v --cov=. --cov-report=term-missing --cov-report=html
+pytest -n auto test_*.py -v --cov=. --cov-report=term-missing --cov-report=html
 
 echo ""
 echo "=========================================="
@@ -1,21 +1,39 @@
 """
 Test runner script for AWS Infrastructure Automation project.
 Runs all tests and generates a coverage report.
+
+Tests run in parallel across all cores when unittest-parallel is
+installed, and serially otherwise.
 """
 
 import unittest
 import sys
 import os
 
+try:
+    from unittest_parallel.main import main as parallel_main
+except ImportError:
+    parallel_main = None
+
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 
 def run_tests():
     """Run all tests."""
+    start_dir = os.path.dirname(os.path.abspath(__file__))
+    
+    if parallel_main is not None:
+        # Exits non-zero on failure, returns on success
+        parallel_main(argv=[
+            "--level", "class", "-v",
+            "-j", str(os.cpu_count() or 1),
+            "-s", start_dir, "-p", "test_*.py"
+        ])
+        return 0
+    
     # Discover and run all tests
     loader = unittest.TestLoader()
-    start_dir = os.path.dirname(os.path.abspath(__file__))
     suite = loader.discover(start_dir, pattern='test_*.py')
     
     # Run tests with verbose output
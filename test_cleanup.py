@@ -0,0 +1,370 @@
+"""
+Unit tests for the cleanup script.
+"""
+
+import contextlib
+import io
+import logging
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from botocore.exceptions import ClientError
+
+import cleanup
+from cleanup import InfrastructureCleaner, main, parse_args
+
+
+class _RecordingHandler(logging.Handler):
+    """Collects the messages that reach it, in order."""
+    
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.addFilter(cleanup._HoldBackFilter())
+    
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class TestInfrastructureCleaner(unittest.TestCase):
+    """Test InfrastructureCleaner orchestration."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        with patch('boto3.session.Session'), patch('cleanup.load_state', return_value={}):
+            self.cleaner = InfrastructureCleaner(region='us-east-1')
+        self.cleaner._clients = {'ec2': Mock(), 'elbv2': Mock()}
+        # Never touch a real state file in the working directory
+        patcher = patch('cleanup.clear_state')
+        self.mock_clear_state = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_clients_created_lazily(self):
+        """Test that clients are created once, on first use."""
+        with patch('boto3.session.Session'), patch('cleanup.load_state', return_value={}):
+            cleaner = InfrastructureCleaner(region='us-east-1')
+        session = cleaner._session
+        
+        session.client.assert_not_called()
+        self.assertIs(cleaner.ec2_client, cleaner.ec2_client)
+        session.client.assert_called_once()
+        self.assertEqual(session.client.call_args[0][0], 'ec2')
+    
+    def test_cleanup_runs_every_step(self):
+        """Test that cleanup runs every teardown step once."""
+        steps = [
+            '_discover_resources',
+            '_delete_load_balancer_and_target_group',
+            '_terminate_instance',
+            '_delete_security_groups',
+            '_delete_key_pair'
+        ]
+        mocks = {}
+        for step in steps:
+            patcher = patch.object(self.cleaner, step)
+            mocks[step] = patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        self.cleaner.cleanup(skip_confirmation=True)
+        
+        for step in steps:
+            mocks[step].assert_called_once()
+    
+    def test_cleanup_clears_state_file(self):
+        """Test that a successful cleanup removes the stale state file."""
+        self.cleaner.state = {'instance': {'InstanceId': 'i-12345'}}
+        with patch.object(self.cleaner, '_discover_resources'), \
+             patch.object(self.cleaner, '_run_concurrently', return_value=[True, True]):
+            self.cleaner.cleanup(skip_confirmation=True)
+        
+        self.mock_clear_state.assert_called_once_with(cleanup.STATE_FILE)
+        self.assertEqual(self.cleaner.state, {})
+    
+    def test_failed_cleanup_keeps_state_file(self):
+        """Test that the state file survives a cleanup that fails."""
+        with patch.object(self.cleaner, '_discover_resources', side_effect=Exception("boom")), \
+             self.assertRaises(SystemExit):
+            self.cleaner.cleanup(skip_confirmation=True)
+        
+        self.mock_clear_state.assert_not_called()
+    
+    def test_step_error_keeps_state_file(self):
+        """Test that a delete that logs an error fails the cleanup and keeps the state file."""
+        self.cleaner._discovered = {}
+        self.cleaner.ec2_client.delete_key_pair.side_effect = ClientError(
+            {'Error': {'Code': 'UnauthorizedOperation'}}, 'DeleteKeyPair'
+        )
+        
+        with patch.object(self.cleaner, '_discover_resources'), \
+             patch('cleanup.announce') as mock_announce, \
+             self.assertRaises(SystemExit):
+            self.cleaner.cleanup(skip_confirmation=True)
+        
+        self.mock_clear_state.assert_not_called()
+        announced = [call[0][0] for call in mock_announce.call_args_list]
+        self.assertFalse(any('successfully' in message for message in announced))
+    
+    def test_security_groups_deleted_after_dependents(self):
+        """Test that security groups are deleted after the LB and instance."""
+        order = []
+        with patch.object(self.cleaner, '_discover_resources'), \
+             patch.object(self.cleaner, '_delete_load_balancer_and_target_group',
+                          side_effect=lambda: order.append('lb') or True), \
+             patch.object(self.cleaner, '_terminate_instance',
+                          side_effect=lambda: order.append('instance') or True), \
+             patch.object(self.cleaner, '_delete_security_groups',
+                          side_effect=lambda: order.append('sg') or True), \
+             patch.object(self.cleaner, '_delete_key_pair'):
+            self.cleaner.cleanup(skip_confirmation=True)
+        
+        self.assertEqual(order[-1], 'sg')
+        self.assertEqual(set(order[:2]), {'lb', 'instance'})
+    
+    def test_concurrent_steps_keep_output_together(self):
+        """Test that a later step's output is replayed after the earlier step's."""
+        handler = _RecordingHandler()
+        cleanup.logger.addHandler(handler)
+        cleanup.logger.setLevel(logging.INFO)
+        self.addCleanup(cleanup.logger.removeHandler, handler)
+        self.addCleanup(cleanup.logger.setLevel, logging.NOTSET)
+        second_done = threading.Event()
+        
+        def first():
+            cleanup.logger.info("first: start")
+            # Let the second step log everything before this one finishes
+            second_done.wait(timeout=5)
+            cleanup.logger.info("first: end")
+        
+        def second():
+            cleanup.logger.info("second: start")
+            cleanup.logger.info("second: end")
+            second_done.set()
+        
+        self.cleaner._run_concurrently(first, second)
+        
+        self.assertEqual(
+            handler.messages,
+            ["first: start", "first: end", "second: start", "second: end"]
+        )
+    
+    def test_failed_step_still_replays_held_output(self):
+        """Test that held-back output is replayed before an earlier step's error is raised."""
+        handler = _RecordingHandler()
+        cleanup.logger.addHandler(handler)
+        cleanup.logger.setLevel(logging.INFO)
+        self.addCleanup(cleanup.logger.removeHandler, handler)
+        self.addCleanup(cleanup.logger.setLevel, logging.NOTSET)
+        
+        def first():
+            cleanup.logger.info("first: start")
+            raise RuntimeError("boom")
+        
+        def second():
+            cleanup.logger.info("second: done")
+            return True
+        
+        with self.assertRaises(RuntimeError):
+            self.cleaner._run_concurrently(first, second)
+        
+        self.assertEqual(handler.messages, ["first: start", "second: done"])
+    
+    def test_discover_resources(self):
+        """Test that discovery stores every resolved ARN/ID."""
+        self.cleaner.elb_client.describe_load_balancers.return_value = {
+            'LoadBalancers': [{'LoadBalancerArn': 'lb-arn'}]
+        }
+        self.cleaner.elb_client.describe_target_groups.side_effect = ClientError(
+            {'Error': {'Code': 'TargetGroupNotFound'}}, 'DescribeTargetGroups'
+        )
+        self.cleaner.ec2_client.describe_instances.return_value = {
+            'Reservations': [{'Instances': [{'InstanceId': 'i-12345'}]}]
+        }
+        sg_name = self.cleaner.resource_names['security_group']
+        self.cleaner.ec2_client.describe_security_groups.return_value = {
+            'SecurityGroups': [{'GroupName': sg_name, 'GroupId': 'sg-12345'}]
+        }
+        
+        self.cleaner._discover_resources()
+        
+        discovered = self.cleaner._discovered
+        self.assertEqual(discovered['lb_arn'], 'lb-arn')
+        self.assertIsNone(discovered['tg_arn'])
+        self.assertEqual(discovered['instance_id'], 'i-12345')
+        self.assertEqual(discovered['sg_ids'], {sg_name: 'sg-12345'})
+        # Both group names are resolved with a single describe call
+        self.cleaner.ec2_client.describe_security_groups.assert_called_once()
+        sg_filter = self.cleaner.ec2_client.describe_security_groups.call_args[1]['Filters'][0]
+        self.assertEqual(
+            sg_filter['Values'],
+            [sg_name, self.cleaner.resource_names['alb_sg']]
+        )
+    
+    def test_find_instance_uses_saved_instance_id(self):
+        """Test that the instance recorded at deploy time is looked up by ID."""
+        self.cleaner.state = {'instance': {'InstanceId': 'i-saved'}}
+        self.cleaner.ec2_client.describe_instances.return_value = {
+            'Reservations': [{'Instances': [{'InstanceId': 'i-saved'}]}]
+        }
+        
+        self.assertEqual(self.cleaner._find_instance(), 'i-saved')
+        call_kwargs = self.cleaner.ec2_client.describe_instances.call_args[1]
+        self.assertEqual(call_kwargs['InstanceIds'], ['i-saved'])
+    
+    def test_find_instance_falls_back_to_name_tag(self):
+        """Test that a stale saved instance ID falls back to the tag lookup."""
+        self.cleaner.state = {'instance': {'InstanceId': 'i-stale'}}
+        self.cleaner.ec2_client.describe_instances.side_effect = [
+            {'Reservations': []},
+            {'Reservations': [{'Instances': [{'InstanceId': 'i-tagged'}]}]}
+        ]
+        
+        self.assertEqual(self.cleaner._find_instance(), 'i-tagged')
+        self.assertEqual(self.cleaner.ec2_client.describe_instances.call_count, 2)
+    
+    def test_delete_skips_undiscovered_resources(self):
+        """Test that delete steps skip resources discovery did not find."""
+        self.cleaner._discovered = {'lb_arn': None, 'tg_arn': None, 'instance_id': None}
+        
+        self.cleaner._delete_load_balancer()
+        self.cleaner._delete_target_group()
+        self.cleaner._terminate_instance()
+        
+        self.cleaner.elb_client.delete_load_balancer.assert_not_called()
+        self.cleaner.elb_client.delete_target_group.assert_not_called()
+        self.cleaner.ec2_client.terminate_instances.assert_not_called()
+    
+    def test_delete_load_balancer_waits_for_deletion(self):
+        """Test that LB deletion waits on the waiter instead of sleeping."""
+        self.cleaner._discovered = {'lb_arn': 'lb-arn'}
+        waiter = self.cleaner.elb_client.get_waiter.return_value
+        
+        with patch('cleanup.time.sleep') as mock_sleep:
+            self.cleaner._delete_load_balancer()
+        
+        self.cleaner.elb_client.delete_load_balancer.assert_called_once_with(
+            LoadBalancerArn='lb-arn'
+        )
+        self.cleaner.elb_client.get_waiter.assert_called_once_with('load_balancers_deleted')
+        waiter.wait.assert_called_once()
+        self.assertEqual(waiter.wait.call_args[1]['LoadBalancerArns'], ['lb-arn'])
+        mock_sleep.assert_not_called()
+    
+    def test_delete_target_group_retries_while_in_use(self):
+        """Test that a target group still held by the LB is retried."""
+        self.cleaner._discovered = {'tg_arn': 'tg-arn'}
+        self.cleaner.elb_client.delete_target_group.side_effect = [
+            ClientError({'Error': {'Code': 'ResourceInUse'}}, 'DeleteTargetGroup'),
+            {}
+        ]
+        
+        with patch('cleanup.time.sleep') as mock_sleep:
+            self.cleaner._delete_target_group()
+        
+        self.assertEqual(self.cleaner.elb_client.delete_target_group.call_count, 2)
+        mock_sleep.assert_called_once()
+    
+    def test_delete_security_groups_deletes_both(self):
+        """Test that both security groups are handed to the per-SG helper."""
+        with patch.object(self.cleaner, '_delete_one_sg') as mock_delete:
+            self.cleaner._delete_security_groups()
+        
+        deleted = {call[0][0] for call in mock_delete.call_args_list}
+        self.assertEqual(
+            deleted,
+            {self.cleaner.resource_names['security_group'],
+             self.cleaner.resource_names['alb_sg']}
+        )
+    
+    def test_delete_one_sg_retries_dependency_violation(self):
+        """Test that a DependencyViolation is retried before succeeding."""
+        self.cleaner._discovered = {'sg_ids': {'test-sg': 'sg-12345'}}
+        self.cleaner.ec2_client.delete_security_group.side_effect = [
+            ClientError({'Error': {'Code': 'DependencyViolation'}}, 'DeleteSecurityGroup'),
+            {}
+        ]
+        
+        with patch('cleanup.time.sleep'):
+            self.cleaner._delete_one_sg('test-sg')
+        
+        self.assertEqual(self.cleaner.ec2_client.delete_security_group.call_count, 2)
+
+
+class TestConfigureLogging(unittest.TestCase):
+    """Test the logging setup used by the cleanup."""
+    
+    def setUp(self):
+        """Start from an unconfigured root logger."""
+        root = logging.getLogger()
+        saved = root.handlers[:]
+        root.handlers.clear()
+        self.addCleanup(setattr, root, 'handlers', saved)
+    
+    def test_output_written_when_unconfigured(self):
+        """Test that cleanup output is written without any prior setup."""
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            with cleanup.configure_logging():
+                cleanup.announce("banner")
+        
+        self.assertEqual(output.getvalue(), "banner\n")
+        self.assertEqual(logging.getLogger().handlers, [])
+    
+    def test_existing_configuration_kept(self):
+        """Test that an already configured root logger is left alone."""
+        handler = logging.NullHandler()
+        logging.getLogger().addHandler(handler)
+        
+        with cleanup.configure_logging():
+            self.assertEqual(logging.getLogger().handlers, [handler])
+
+
+class TestCleanupMain(unittest.TestCase):
+    """Test the cleanup command line entry point."""
+    
+    def test_parse_args_force(self):
+        """Test the --force flag."""
+        self.assertTrue(parse_args(['--force']).force)
+        self.assertFalse(parse_args([]).force)
+    
+    @patch('cleanup.configure_logging')
+    @patch('cleanup.InfrastructureCleaner')
+    @patch('builtins.input', return_value='no')
+    def test_declined_prompt_skips_cleaner(self, mock_input, MockCleaner, mock_logging):
+        """Test that declining the prompt never constructs the cleaner."""
+        with patch('sys.argv', ['cleanup.py']), patch('sys.stdout'):
+            main()
+        
+        mock_input.assert_called_once()
+        MockCleaner.assert_not_called()
+    
+    @patch('cleanup.configure_logging')
+    @patch('cleanup.InfrastructureCleaner')
+    def test_banner_printed_once_before_prompt(self, MockCleaner, mock_logging):
+        """Test that the banner is shown before the warning and prompt."""
+        calls = Mock()
+        calls.input.return_value = 'yes'
+        with patch('sys.argv', ['cleanup.py']), patch('sys.stdout'), \
+             patch('builtins.input', calls.input), \
+             patch('cleanup.print_section', calls.print_section):
+            main()
+        
+        self.assertEqual(
+            [name for name, _, _ in calls.mock_calls],
+            ['print_section', 'input']
+        )
+        MockCleaner.return_value.cleanup.assert_called_once_with(skip_confirmation=True)
+    
+    @patch('cleanup.configure_logging')
+    @patch('cleanup.InfrastructureCleaner')
+    @patch('builtins.input')
+    def test_force_skips_prompt(self, mock_input, MockCleaner, mock_logging):
+        """Test that --force runs the cleanup without prompting."""
+        with patch('sys.argv', ['cleanup.py', '--force']):
+            main()
+        
+        mock_input.assert_not_called()
+        MockCleaner.return_value.cleanup.assert_called_once_with(skip_confirmation=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
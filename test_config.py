@@ -17,6 +17,15 @@ from config import (
     ALB_SG_RULES
 )
 
+# Resources every deployment names
+_REQUIRED_RESOURCE_KEYS = frozenset({
+    "key_pair", "security_group", "instance",
+    "alb", "target_group", "alb_sg"
+})
+
+# (FromPort, ToPort) of every ALB rule, built once since the rules are frozen
+_ALB_PORTS = frozenset((rule.get("FromPort"), rule.get("ToPort")) for rule in ALB_SG_RULES)
+
 
 class TestConfig(unittest.TestCase):
     """Test configuration module."""
@@ -48,17 +57,13 @@ class TestConfig(unittest.TestCase):
         names = get_resource_names()
         
         # Check all required keys exist
-        required_keys = [
-            "key_pair", "security_group", "instance",
-            "alb", "target_group", "alb_sg"
-        ]
-        for key in required_keys:
-            self.assertIn(key, names)
-            self.assertIsInstance(names[key], str)
-            self.assertTrue(len(names[key]) > 0)
+        missing = _REQUIRED_RESOURCE_KEYS - names.keys()
+        self.assertFalse(missing, f"Missing resource names: {sorted(missing)}")
         
-        # Check that resource names include template name
+        # Check that resource names are strings including the (non-empty)
+        # template name, which also makes them non-empty
         for key, value in names.items():
+            self.assertIsInstance(value, str)
             self.assertIn(TEMPLATE_NAME, value)
     
     def test_get_user_data(self):
@@ -75,6 +80,10 @@ class TestConfig(unittest.TestCase):
         self.assertIn(TEMPLATE_ID, user_data)
         self.assertIn(TEMPLATE_NAME, user_data)
     
+    def test_get_user_data_is_cached(self):
+        """Test that the user data script is rendered only once."""
+        self.assertIs(get_user_data(), get_user_data())
+    
     def test_get_tags(self):
         """Test tag generation."""
         tags = get_tags()
@@ -91,7 +100,7 @@ class TestConfig(unittest.TestCase):
     
     def test_instance_security_group_rules(self):
         """Test instance security group rules."""
-        self.assertIsInstance(INSTANCE_SG_RULES, list)
+        self.assertIsInstance(INSTANCE_SG_RULES, tuple)
         self.assertTrue(len(INSTANCE_SG_RULES) > 0)
         
         for rule in INSTANCE_SG_RULES:
@@ -99,17 +108,20 @@ class TestConfig(unittest.TestCase):
             self.assertIn("FromPort", rule)
             self.assertIn("ToPort", rule)
     
+    def test_security_group_rules_are_read_only(self):
+        """Test that the shared rule definitions cannot be mutated in place."""
+        with self.assertRaises(TypeError):
+            INSTANCE_SG_RULES[0]["FromPort"] = 2222
+        with self.assertRaises(TypeError):
+            get_resource_names()["alb"] = "other-alb"
+    
     def test_alb_security_group_rules(self):
         """Test ALB security group rules."""
-        self.assertIsInstance(ALB_SG_RULES, list)
+        self.assertIsInstance(ALB_SG_RULES, tuple)
         self.assertTrue(len(ALB_SG_RULES) > 0)
         
         # Check for HTTP rule (port 80)
-        has_http = any(
-            rule.get("FromPort") == 80 and rule.get("ToPort") == 80
-            for rule in ALB_SG_RULES
-        )
-        self.assertTrue(has_http, "ALB should have HTTP (port 80) rule")
+        self.assertIn((80, 80), _ALB_PORTS, "ALB should have HTTP (port 80) rule")
 
 
 class TestConfigEnvironmentVariables(unittest.TestCase):
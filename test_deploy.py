@@ -0,0 +1,101 @@
+"""
+Unit tests for the deployment script.
+"""
+
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from deploy import InfrastructureDeployer, parse_args
+
+
+class TestInfrastructureDeployer(unittest.TestCase):
+    """Test InfrastructureDeployer orchestration."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        with patch('deploy.make_session'), patch('deploy.make_clients', return_value={
+            'ec2': Mock(), 'elbv2': Mock()
+        }):
+            self.deployer = InfrastructureDeployer(region='us-east-1')
+        self.deployer.instance_manager = Mock()
+        self.deployer.alb_manager = Mock()
+        self.deployer.resources = {
+            'instance_sg': {'GroupId': 'sg-instance', 'VpcId': 'vpc-12345'},
+            'alb_sg': {'GroupId': 'sg-alb'}
+        }
+        
+        self.deployer.instance_manager.create_instance.return_value = {
+            'InstanceId': 'i-12345',
+            'PublicIpAddress': '1.2.3.4',
+            'PrivateIpAddress': '10.0.0.1',
+            'AvailabilityZone': 'us-east-1a'
+        }
+        self.deployer.alb_manager.get_all_subnets.return_value = ['subnet-1', 'subnet-2']
+        self.deployer.alb_manager.create_target_group.return_value = {
+            'TargetGroupArn': 'arn:tg/test-tg', 'TargetGroupName': 'test-tg'
+        }
+        self.deployer.alb_manager.create_load_balancer.return_value = {
+            'LoadBalancerArn': 'arn:lb/test-alb', 'LoadBalancerName': 'test-alb'
+        }
+        
+        patcher = patch('deploy.save_state')
+        self.mock_save_state = patcher.start()
+        self.addCleanup(patcher.stop)
+    
+    def test_instance_and_load_balancer_overlap(self):
+        """Test that the instance launch and the LB creation run concurrently."""
+        # Each branch blocks until the other has started too
+        both_started = threading.Barrier(2, timeout=5)
+        
+        def rendezvous(mock_method):
+            result = mock_method.return_value
+            
+            def wait(**kwargs):
+                both_started.wait()
+                return result
+            mock_method.side_effect = wait
+        
+        rendezvous(self.deployer.instance_manager.create_instance)
+        rendezvous(self.deployer.alb_manager.create_load_balancer)
+        
+        with patch('sys.stdout'):
+            self.deployer._create_instance_and_alb()
+        
+        self.assertEqual(self.deployer.resources['instance']['InstanceId'], 'i-12345')
+        self.assertEqual(
+            self.deployer.alb_manager.create_target_group.call_args[1]['vpc_id'],
+            'vpc-12345'
+        )
+    
+    def test_targets_registered_after_both_branches(self):
+        """Test that registration and the listener use both branches' results."""
+        with patch('sys.stdout'):
+            self.deployer._create_instance_and_alb()
+        
+        self.deployer.alb_manager.register_targets.assert_called_once_with(
+            target_group_arn='arn:tg/test-tg',
+            instance_ids=['i-12345']
+        )
+        self.deployer.alb_manager.create_listener.assert_called_once_with(
+            load_balancer_arn='arn:lb/test-alb',
+            target_group_arn='arn:tg/test-tg',
+            tags=self.deployer.tags
+        )
+        self.mock_save_state.assert_called_once()
+    
+    def test_fresh_clears_ami_cache(self):
+        """Test that --fresh drops the cached AMI IDs."""
+        self.assertTrue(parse_args(['--fresh']).fresh)
+        self.assertFalse(parse_args([]).fresh)
+        
+        with patch('deploy.make_session'), \
+             patch('deploy.make_clients', return_value={'ec2': Mock(), 'elbv2': Mock()}), \
+             patch('deploy.JSONFileCache') as MockCache:
+            InfrastructureDeployer(region='us-east-1', fresh=True)
+        
+        MockCache.return_value.clear.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,7 @@ These tests verify the interaction between components.
 """
 
 import unittest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch
 import sys
 
 from config import get_resource_names, get_user_data, get_tags
@@ -15,16 +15,27 @@ from modules import (
     ALBManager
 )
 
+# Setup steps the user data script must contain
+REQUIRED_USER_DATA_COMMANDS = frozenset({
+    'yum update',
+    'yum install',
+    'httpd',
+    'systemctl start',
+    'systemctl enable',
+    'wget',
+    'unzip',
+    'chown',
+    'chmod'
+})
+
 
 class TestDeploymentWorkflow(unittest.TestCase):
     """Test the complete deployment workflow."""
     
-    def setUp(self):
-        """Set up test fixtures."""
-        self.mock_ec2_client = Mock()
-        self.mock_ec2_resource = Mock()
-        self.mock_elbv2_client = Mock()
-        self.resource_names = get_resource_names()
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by every test in the class."""
+        cls.resource_names = get_resource_names()
     
     @patch('modules.keypair.KeyPairManager')
     def test_key_pair_creation_workflow(self, MockKeyPairManager):
@@ -86,8 +97,7 @@ class TestDeploymentWorkflow(unittest.TestCase):
         
         # Simulate workflow
         vpc_id, subnets = mock_alb_manager.get_subnets()
-        self.assertEqual(vpc_id, 'vpc-12345')
-        self.assertEqual(len(subnets), 2)
+        self.assertEqual((vpc_id, subnets), ('vpc-12345', ['subnet-1', 'subnet-2']))
         
         tg_arn = mock_alb_manager.create_target_group('test-tg', vpc_id)
         self.assertEqual(tg_arn, 'tg-arn')
@@ -102,58 +112,43 @@ class TestResourceNameConsistency(unittest.TestCase):
     
     def test_resource_names_consistency(self):
         """Test that resource names are consistent across calls."""
-        names1 = get_resource_names()
-        names2 = get_resource_names()
-        
-        self.assertEqual(names1, names2)
+        # The names are one module-level mapping, so identity implies equality
+        self.assertIs(get_resource_names(), get_resource_names())
     
     def test_resource_names_format(self):
         """Test resource name format."""
         names = get_resource_names()
         
         for key, value in names.items():
-            # Check no spaces in resource names
-            self.assertNotIn(' ', value)
-            # Check names are lowercase or kebab-case
-            self.assertTrue(
-                value.islower() or '-' in value,
-                f"Resource name '{value}' should be lowercase or kebab-case"
-            )
+            with self.subTest(resource=key):
+                # Check no spaces in resource names
+                self.assertNotIn(' ', value)
+                # Check names are lowercase or kebab-case
+                self.assertTrue(
+                    value.islower() or '-' in value,
+                    f"Resource name '{value}' should be lowercase or kebab-case"
+                )
 
 
 class TestConfigurationIntegration(unittest.TestCase):
     """Test configuration integration with modules."""
     
+    @classmethod
+    def setUpClass(cls):
+        """Render the configuration once for every test in the class."""
+        cls.user_data = get_user_data()
+        cls.tags = get_tags()
+    
     def test_user_data_script_completeness(self):
         """Test that user data script is complete."""
-        user_data = get_user_data()
-        
-        # Check for essential setup steps
-        required_commands = [
-            'yum update',
-            'yum install',
-            'httpd',
-            'systemctl start',
-            'systemctl enable',
-            'wget',
-            'unzip',
-            'chown',
-            'chmod'
-        ]
-        
-        for cmd in required_commands:
-            self.assertIn(
-                cmd,
-                user_data,
-                f"User data missing essential command: {cmd}"
-            )
+        # Check for essential setup steps, reporting every missing one at once
+        missing = sorted(cmd for cmd in REQUIRED_USER_DATA_COMMANDS if cmd not in self.user_data)
+        self.assertFalse(missing, f"User data missing essential commands: {missing}")
     
     def test_tags_structure(self):
         """Test tags structure is compatible with AWS."""
-        tags = get_tags()
-        
         # AWS tags must have Key and Value
-        for tag in tags:
+        for tag in self.tags:
             self.assertIn('Key', tag)
             self.assertIn('Value', tag)
             # AWS tag keys/values should not be empty
@@ -2,26 +2,46 @@
 Unit tests for AWS modules.
 """
 
+import itertools
+import os
+import tempfile
 import unittest
-from unittest.mock import Mock, MagicMock, patch
+from unittest.mock import Mock, patch
 from botocore.exceptions import ClientError
 
+from modules import _aws_cache
+from modules._backoff import backoff_delays, wait_until
+
 from modules import (
     KeyPairManager,
     SecurityGroupManager,
     EC2InstanceManager,
-    ALBManager
+    ALBManager,
+    get_client_config,
+    make_clients
+)
+
+# Lookup misses shared by the tests, built once rather than per test
+_INSTANCE_NOT_FOUND = ClientError(
+    {'Error': {'Code': 'InvalidInstanceID.NotFound'}}, 'DescribeInstances'
 )
+_TG_NOT_FOUND = ClientError({'Error': {'Code': 'TargetGroupNotFound'}}, 'DescribeTargetGroups')
+_LB_NOT_FOUND = ClientError({'Error': {'Code': 'LoadBalancerNotFound'}}, 'DescribeLoadBalancers')
 
 
 class TestKeyPairManager(unittest.TestCase):
     """Test KeyPairManager class."""
     
-    def setUp(self):
-        """Set up test fixtures."""
-        self.mock_ec2_client = Mock()
-        self.key_pair_name = "test-keypair"
-        self.manager = KeyPairManager(self.mock_ec2_client)
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by every test in the class."""
+        cls.mock_ec2_client = Mock()
+        cls.key_pair_name = "test-keypair"
+        cls.manager = KeyPairManager(cls.mock_ec2_client)
+    
+    def tearDown(self):
+        """Forget the calls and responses configured by the test."""
+        self.mock_ec2_client.reset_mock(return_value=True, side_effect=True)
     
     def test_initialization(self):
         """Test KeyPairManager initialization."""
@@ -29,10 +49,7 @@ class TestKeyPairManager(unittest.TestCase):
     
     def test_create_key_pair_success(self):
         """Test successful key pair creation."""
-        self.mock_ec2_client.describe_key_pairs.side_effect = ClientError(
-            {'Error': {'Code': 'InvalidKeyPair.NotFound'}},
-            'DescribeKeyPairs'
-        )
+        self.mock_ec2_client.describe_key_pairs.return_value = {'KeyPairs': []}
         self.mock_ec2_client.create_key_pair.return_value = {
             'KeyMaterial': 'test-key-material',
             'KeyName': self.key_pair_name,
@@ -45,6 +62,61 @@ class TestKeyPairManager(unittest.TestCase):
         self.assertIn('KeyName', result)
         self.assertEqual(result['KeyName'], self.key_pair_name)
     
+    def test_create_key_pair_tagged_at_creation(self):
+        """Test that tags are passed to create_key_pair itself."""
+        tags = [{'Key': 'Project', 'Value': 'test'}]
+        self.mock_ec2_client.describe_key_pairs.return_value = {'KeyPairs': []}
+        self.mock_ec2_client.create_key_pair.return_value = {'KeyPairId': 'key-12345'}
+        
+        self.manager.create_key_pair(self.key_pair_name, tags=tags)
+        
+        self.mock_ec2_client.create_key_pair.assert_called_once_with(
+            KeyName=self.key_pair_name,
+            TagSpecifications=[{'ResourceType': 'key-pair', 'Tags': tags}]
+        )
+        self.mock_ec2_client.create_tags.assert_not_called()
+    
+    def test_create_key_pair_saves_private_key(self):
+        """Test that the private key is written owner-read-only."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        key_file = os.path.join(tmp_dir.name, 'test-keypair.pem')
+        self.mock_ec2_client.describe_key_pairs.return_value = {'KeyPairs': []}
+        self.mock_ec2_client.create_key_pair.return_value = {
+            'KeyMaterial': 'test-key-material',
+            'KeyPairId': 'key-12345'
+        }
+        
+        self.manager.create_key_pair(self.key_pair_name, save_path=key_file)
+        
+        self.assertEqual(os.stat(key_file).st_mode & 0o777, 0o400)
+        with open(key_file) as f:
+            self.assertEqual(f.read(), 'test-key-material')
+    
+    def test_create_key_pair_existing_key_file(self):
+        """Test that a leftover key file stops creation before AWS is called."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        key_file = os.path.join(tmp_dir.name, 'test-keypair.pem')
+        open(key_file, 'w').close()
+        self.mock_ec2_client.describe_key_pairs.return_value = {'KeyPairs': []}
+        
+        with self.assertRaises(FileExistsError):
+            self.manager.create_key_pair(self.key_pair_name, save_path=key_file)
+        self.mock_ec2_client.create_key_pair.assert_not_called()
+    
+    def test_create_key_pair_existing(self):
+        """Test that an existing key pair is reused without calling create."""
+        self.mock_ec2_client.describe_key_pairs.return_value = {
+            'KeyPairs': [{'KeyPairId': 'key-12345', 'KeyName': self.key_pair_name}]
+        }
+        
+        result = self.manager.create_key_pair(self.key_pair_name)
+        
+        self.assertTrue(result['Exists'])
+        self.assertEqual(result['KeyPairId'], 'key-12345')
+        self.mock_ec2_client.create_key_pair.assert_not_called()
+    
     def test_delete_key_pair_success(self):
         """Test successful key pair deletion."""
         self.mock_ec2_client.delete_key_pair.return_value = {}
@@ -58,29 +130,30 @@ class TestKeyPairManager(unittest.TestCase):
 class TestSecurityGroupManager(unittest.TestCase):
     """Test SecurityGroupManager class."""
     
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by every test in the class."""
+        cls.mock_ec2_client = Mock()
+        cls.group_name = "test-sg"
+        cls.description = "Test security group"
+        cls.manager = SecurityGroupManager(cls.mock_ec2_client)
+    
     def setUp(self):
-        """Set up test fixtures."""
-        self.mock_ec2_client = Mock()
-        self.mock_ec2_resource = Mock()
-        self.group_name = "test-sg"
-        self.description = "Test security group"
-        self.manager = SecurityGroupManager(
-            self.mock_ec2_client,
-            self.mock_ec2_resource
-        )
+        """Start every test with an empty VPC cache."""
+        _aws_cache.invalidate()
+    
+    def tearDown(self):
+        """Forget the calls and responses configured by the test."""
+        self.mock_ec2_client.reset_mock(return_value=True, side_effect=True)
     
     def test_initialization(self):
         """Test SecurityGroupManager initialization."""
         self.assertEqual(self.manager.ec2_client, self.mock_ec2_client)
-        self.assertEqual(self.manager.ec2_resource, self.mock_ec2_resource)
     
     def test_create_security_group_success(self):
         """Test successful security group creation."""
         vpc_id = "vpc-12345"
-        self.mock_ec2_client.describe_security_groups.side_effect = ClientError(
-            {'Error': {'Code': 'InvalidGroup.NotFound'}},
-            'DescribeSecurityGroups'
-        )
+        self.mock_ec2_client.describe_security_groups.return_value = {'SecurityGroups': []}
         self.mock_ec2_client.describe_vpcs.return_value = {
             'Vpcs': [{'VpcId': vpc_id}]
         }
@@ -96,6 +169,22 @@ class TestSecurityGroupManager(unittest.TestCase):
         self.assertIsInstance(result, dict)
         self.assertIn('GroupId', result)
     
+    def test_create_security_group_existing(self):
+        """Test that an existing group in the VPC is reused without calling create."""
+        self.mock_ec2_client.describe_security_groups.return_value = {
+            'SecurityGroups': [{'GroupId': 'sg-12345', 'VpcId': 'vpc-12345'}]
+        }
+        
+        result = self.manager.create_security_group(
+            self.group_name,
+            self.description,
+            vpc_id='vpc-12345'
+        )
+        
+        self.assertTrue(result['Exists'])
+        self.assertEqual(result['VpcId'], 'vpc-12345')
+        self.mock_ec2_client.create_security_group.assert_not_called()
+    
     def test_add_ingress_rules_success(self):
         """Test adding ingress rules."""
         rules = [
@@ -112,6 +201,28 @@ class TestSecurityGroupManager(unittest.TestCase):
         self.assertTrue(result)
         self.mock_ec2_client.authorize_security_group_ingress.assert_called_once()
     
+    def test_add_ingress_rules_builds_permissions(self):
+        """Test that my_ip fills rules without a CIDR, and descriptions are kept."""
+        rules = [
+            {'IpProtocol': 'tcp', 'FromPort': 22, 'ToPort': 22, 'Description': 'SSH'},
+            {'IpProtocol': 'tcp', 'FromPort': 80, 'ToPort': 80, 'CidrIp': '0.0.0.0/0'}
+        ]
+        
+        self.manager.add_ingress_rules('sg-12345', rules, my_ip='1.2.3.4')
+        
+        permissions = self.mock_ec2_client.authorize_security_group_ingress.call_args[1]['IpPermissions']
+        self.assertEqual(permissions[0]['IpRanges'], [{'CidrIp': '1.2.3.4/32', 'Description': 'SSH'}])
+        self.assertEqual(permissions[1]['IpRanges'], [{'CidrIp': '0.0.0.0/0'}])
+    
+    def test_add_ingress_rules_skips_rules_without_cidr(self):
+        """Test that rules needing my_ip are skipped when it is unknown."""
+        rules = [{'IpProtocol': 'tcp', 'FromPort': 22, 'ToPort': 22, 'Description': 'SSH'}]
+        
+        result = self.manager.add_ingress_rules('sg-12345', rules)
+        
+        self.assertTrue(result)
+        self.mock_ec2_client.authorize_security_group_ingress.assert_not_called()
+    
     def test_delete_security_group_success(self):
         """Test successful security group deletion."""
         self.mock_ec2_client.delete_security_group.return_value = {}
@@ -125,32 +236,67 @@ class TestSecurityGroupManager(unittest.TestCase):
 class TestEC2InstanceManager(unittest.TestCase):
     """Test EC2InstanceManager class."""
     
-    def setUp(self):
-        """Set up test fixtures."""
-        self.mock_ec2_client = Mock()
-        self.mock_ec2_resource = Mock()
-        self.manager = EC2InstanceManager(
-            self.mock_ec2_client,
-            self.mock_ec2_resource
-        )
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by every test in the class."""
+        cls.mock_ec2_client = Mock()
+        cls.manager = EC2InstanceManager(cls.mock_ec2_client)
+    
+    def tearDown(self):
+        """Forget the calls and responses configured by the test."""
+        self.mock_ec2_client.reset_mock(return_value=True, side_effect=True)
     
     def test_initialization(self):
         """Test EC2InstanceManager initialization."""
         self.assertEqual(self.manager.ec2_client, self.mock_ec2_client)
-        self.assertEqual(self.manager.ec2_resource, self.mock_ec2_resource)
     
     def test_get_ami_id_success(self):
         """Test getting AMI ID."""
-        self.mock_ec2_client.describe_images.return_value = {
-            'Images': [
-                {'ImageId': 'ami-12345', 'CreationDate': '2024-01-01T00:00:00.000Z', 'Name': 'test-ami-1'},
+        paginator = self.mock_ec2_client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {'Images': [
+                {'ImageId': 'ami-12345', 'CreationDate': '2024-01-01T00:00:00.000Z', 'Name': 'test-ami-1'}
+            ]},
+            {'Images': [
                 {'ImageId': 'ami-67890', 'CreationDate': '2024-01-02T00:00:00.000Z', 'Name': 'test-ami-2'}
-            ]
-        }
+            ]}
+        ]
         
         ami_id = self.manager.get_ami_id('test-filter')
         
         self.assertEqual(ami_id, 'ami-67890')
+        self.mock_ec2_client.get_paginator.assert_called_once_with('describe_images')
+        self.assertEqual(
+            paginator.paginate.call_args[1]['PaginationConfig'], {'PageSize': 100}
+        )
+    
+    def test_get_ami_id_uses_cache(self):
+        """Test that a cached AMI skips the describe, and a miss fills the cache."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        cache = _aws_cache.JSONFileCache(os.path.join(tmp_dir.name, 'amis.json'), ttl=3600)
+        self.mock_ec2_client.meta.region_name = 'us-east-1'
+        self.mock_ec2_client.get_paginator.return_value.paginate.return_value = [
+            {'Images': [
+                {'ImageId': 'ami-12345', 'CreationDate': '2024-01-01T00:00:00.000Z', 'Name': 'test-ami'}
+            ]}
+        ]
+        manager = EC2InstanceManager(self.mock_ec2_client, ami_cache=cache)
+        
+        self.assertEqual(manager.get_ami_id('test-filter'), 'ami-12345')
+        self.assertEqual(manager.get_ami_id('test-filter'), 'ami-12345')
+        
+        self.mock_ec2_client.get_paginator.assert_called_once()
+        self.assertEqual(cache.get('us-east-1/amazon/test-filter'), 'ami-12345')
+    
+    def test_get_ami_id_no_match(self):
+        """Test that an empty result raises."""
+        self.mock_ec2_client.get_paginator.return_value.paginate.return_value = [
+            {'Images': []}
+        ]
+        
+        with self.assertRaises(Exception):
+            self.manager.get_ami_id('test-filter')
     
     def test_create_instance_success(self):
         """Test successful instance creation."""
@@ -192,6 +338,94 @@ class TestEC2InstanceManager(unittest.TestCase):
         self.assertIsInstance(result, dict)
         self.assertIn('InstanceId', result)
     
+    def test_get_instances_info_single_call(self):
+        """Test that several instances are described in one call."""
+        def instance(instance_id):
+            return {
+                'InstanceId': instance_id,
+                'State': {'Name': 'running'},
+                'InstanceType': 't2.micro',
+                'Placement': {'AvailabilityZone': 'us-east-1a'}
+            }
+        self.mock_ec2_client.describe_instances.return_value = {
+            'Reservations': [
+                {'Instances': [instance('i-1')]},
+                {'Instances': [instance('i-2')]}
+            ]
+        }
+        
+        info = self.manager.get_instances_info(['i-1', 'i-2'])
+        
+        self.assertEqual(set(info), {'i-1', 'i-2'})
+        self.assertEqual(info['i-2']['State'], 'running')
+        self.mock_ec2_client.describe_instances.assert_called_once_with(
+            InstanceIds=['i-1', 'i-2']
+        )
+    
+    def test_get_instance_by_name_reuses_describe(self):
+        """Test that a name lookup does not describe the instance twice."""
+        self.mock_ec2_client.describe_instances.return_value = {
+            'Reservations': [{
+                'Instances': [{
+                    'InstanceId': 'i-12345',
+                    'State': {'Name': 'running'},
+                    'InstanceType': 't2.micro',
+                    'Placement': {'AvailabilityZone': 'us-east-1a'}
+                }]
+            }]
+        }
+        
+        result = self.manager.get_instance_by_name('test-instance')
+        
+        self.assertEqual(result['InstanceId'], 'i-12345')
+        self.mock_ec2_client.describe_instances.assert_called_once()
+    
+    def test_wait_running_polls_until_running(self):
+        """Test that waiting retries a new, not yet visible instance."""
+        def described(state):
+            return {'Reservations': [{'Instances': [{
+                'InstanceId': 'i-12345',
+                'State': {'Name': state},
+                'InstanceType': 't2.micro',
+                'Placement': {'AvailabilityZone': 'us-east-1a'}
+            }]}]}
+        self.mock_ec2_client.describe_instances.side_effect = [
+            _INSTANCE_NOT_FOUND,
+            described('pending'),
+            described('running')
+        ]
+        
+        with patch('modules._backoff.time.sleep') as mock_sleep, \
+             patch('modules.ec2_instance.logger') as mock_logger:
+            info = self.manager.wait_running(['i-12345'])
+        
+        self.assertEqual(info['i-12345']['State'], 'running')
+        self.assertEqual(mock_sleep.call_count, 2)
+        # Expected not-found polls are not reported as errors
+        mock_logger.error.assert_not_called()
+    
+    def test_wait_running_terminated_instance(self):
+        """Test that an instance that terminates stops the wait."""
+        self.mock_ec2_client.describe_instances.return_value = {
+            'Reservations': [{'Instances': [{
+                'InstanceId': 'i-12345',
+                'State': {'Name': 'terminated'},
+                'InstanceType': 't2.micro',
+                'Placement': {'AvailabilityZone': 'us-east-1a'}
+            }]}]
+        }
+        
+        with patch('modules._backoff.time.sleep'), self.assertRaises(Exception) as ctx:
+            self.manager.wait_running(['i-12345'])
+        self.assertIn('i-12345', str(ctx.exception))
+    
+    def test_wait_running_default_timeout(self):
+        """Test that waiting keeps the stock waiter's 600-second ceiling."""
+        with patch('modules.ec2_instance.wait_until') as mock_wait:
+            self.manager.wait_running(['i-12345'])
+        
+        self.assertEqual(mock_wait.call_args.kwargs['timeout'], 600)
+    
     def test_terminate_instance_success(self):
         """Test successful instance termination."""
         self.mock_ec2_client.terminate_instances.return_value = {}
@@ -205,16 +439,26 @@ class TestEC2InstanceManager(unittest.TestCase):
 class TestALBManager(unittest.TestCase):
     """Test ALBManager class."""
     
-    def setUp(self):
-        """Set up test fixtures."""
-        self.mock_elb_client = Mock()
-        self.mock_ec2_client = Mock()
-        self.alb_name = "test-alb"
-        self.manager = ALBManager(
-            self.mock_elb_client,
-            self.mock_ec2_client
+    @classmethod
+    def setUpClass(cls):
+        """Set up fixtures shared by every test in the class."""
+        cls.mock_elb_client = Mock()
+        cls.mock_ec2_client = Mock()
+        cls.alb_name = "test-alb"
+        cls.manager = ALBManager(
+            cls.mock_elb_client,
+            cls.mock_ec2_client
         )
     
+    def setUp(self):
+        """Start every test with an empty VPC cache."""
+        _aws_cache.invalidate()
+    
+    def tearDown(self):
+        """Forget the calls and responses configured by the test."""
+        for client in (self.mock_elb_client, self.mock_ec2_client):
+            client.reset_mock(return_value=True, side_effect=True)
+    
     def test_initialization(self):
         """Test ALBManager initialization."""
         self.assertEqual(self.manager.elb_client, self.mock_elb_client)
@@ -234,16 +478,27 @@ class TestALBManager(unittest.TestCase):
         
         subnet_ids = self.manager.get_all_subnets('vpc-12345')
         
-        self.assertEqual(len(subnet_ids), 2)
-        self.assertIn('subnet-1', subnet_ids)
-        self.assertIn('subnet-2', subnet_ids)
+        self.assertCountEqual(subnet_ids, ['subnet-1', 'subnet-2'])
+    
+    def test_get_all_subnets_cached(self):
+        """Test that repeated subnet lookups reuse the cached result."""
+        self.mock_ec2_client.describe_subnets.return_value = {
+            'Subnets': [{'SubnetId': 'subnet-1'}, {'SubnetId': 'subnet-2'}]
+        }
+        
+        first = self.manager.get_all_subnets('vpc-12345')
+        second = self.manager.get_all_subnets('vpc-12345')
+        
+        self.assertEqual(first, second)
+        self.mock_ec2_client.describe_subnets.assert_called_once()
+        
+        _aws_cache.invalidate('vpc-12345')
+        self.manager.get_all_subnets('vpc-12345')
+        self.assertEqual(self.mock_ec2_client.describe_subnets.call_count, 2)
     
     def test_create_target_group_success(self):
         """Test successful target group creation."""
-        self.mock_elb_client.describe_target_groups.side_effect = ClientError(
-            {'Error': {'Code': 'TargetGroupNotFound'}},
-            'DescribeTargetGroups'
-        )
+        self.mock_elb_client.describe_target_groups.side_effect = _TG_NOT_FOUND
         self.mock_elb_client.create_target_group.return_value = {
             'TargetGroups': [{'TargetGroupArn': 'arn:aws:elasticloadbalancing:...'}]
         }
@@ -253,12 +508,55 @@ class TestALBManager(unittest.TestCase):
         self.assertIsInstance(result, dict)
         self.assertIn('TargetGroupArn', result)
     
+    def test_create_target_group_existing(self):
+        """Test that an existing target group is reused without calling create."""
+        self.mock_elb_client.describe_target_groups.return_value = {
+            'TargetGroups': [{'TargetGroupArn': 'tg-arn'}]
+        }
+        
+        result = self.manager.create_target_group('test-tg', 'vpc-12345')
+        
+        self.assertTrue(result['Exists'])
+        self.assertEqual(result['TargetGroupArn'], 'tg-arn')
+        self.mock_elb_client.create_target_group.assert_not_called()
+    
+    def test_create_target_group_duplicate_gone(self):
+        """Test that a duplicate deleted before the lookup re-raises the error."""
+        self.mock_elb_client.describe_target_groups.side_effect = _TG_NOT_FOUND
+        self.mock_elb_client.create_target_group.side_effect = ClientError(
+            {'Error': {'Code': 'DuplicateTargetGroupName'}}, 'CreateTargetGroup'
+        )
+        
+        with self.assertRaises(ClientError) as ctx:
+            self.manager.create_target_group('test-tg', 'vpc-12345')
+        self.assertEqual(ctx.exception.response['Error']['Code'], 'DuplicateTargetGroupName')
+    
+    def test_create_load_balancer_existing(self):
+        """Test that an existing load balancer is reused without calling create."""
+        self.mock_elb_client.describe_load_balancers.return_value = {
+            'LoadBalancers': [{
+                'LoadBalancerArn': 'lb-arn',
+                'LoadBalancerName': 'test-alb',
+                'DNSName': 'alb.example',
+                'Scheme': 'internet-facing',
+                'State': {'Code': 'active'}
+            }]
+        }
+        
+        with patch.object(ALBManager, 'wait_active') as mock_wait:
+            result = self.manager.create_load_balancer(self.alb_name, ['sg-12345'], ['subnet-1'])
+        
+        self.assertTrue(result['Exists'])
+        self.assertEqual(result['DNSName'], 'alb.example')
+        self.mock_elb_client.create_load_balancer.assert_not_called()
+        mock_wait.assert_not_called()
+    
     def test_create_load_balancer_success(self):
         """Test successful load balancer creation."""
-        self.mock_elb_client.describe_load_balancers.side_effect = ClientError(
-            {'Error': {'Code': 'LoadBalancerNotFound'}},
-            'DescribeLoadBalancers'
-        )
+        self.mock_elb_client.describe_load_balancers.side_effect = [
+            _LB_NOT_FOUND,
+            {'LoadBalancers': [{'State': {'Code': 'active'}}]}
+        ]
         self.mock_elb_client.create_load_balancer.return_value = {
             'LoadBalancers': [{
                 'LoadBalancerArn': 'arn:aws:elasticloadbalancing:...',
@@ -266,19 +564,334 @@ class TestALBManager(unittest.TestCase):
                 'LoadBalancerName': 'test-alb',
                 'Scheme': 'internet-facing',
                 'VpcId': 'vpc-12345',
-                'State': {'Code': 'active'},
+                'State': {'Code': 'provisioning'},
                 'Type': 'application'
             }]
         }
         
-        result = self.manager.create_load_balancer(
-            self.alb_name,
-            ['subnet-1', 'subnet-2'],
-            ['sg-12345']
-        )
+        with patch('modules._backoff.time.sleep'):
+            result = self.manager.create_load_balancer(
+                self.alb_name,
+                ['subnet-1', 'subnet-2'],
+                ['sg-12345']
+            )
         
         self.assertIsInstance(result, dict)
         self.assertIn('LoadBalancerArn', result)
+        self.assertEqual(self.mock_elb_client.describe_load_balancers.call_count, 2)
+    
+    def test_create_load_balancer_existing_provisioning(self):
+        """Test that an existing load balancer is waited on until it is active."""
+        def described(state):
+            return {'LoadBalancers': [{
+                'LoadBalancerArn': 'lb-arn',
+                'LoadBalancerName': 'test-alb',
+                'DNSName': 'alb.example',
+                'Scheme': 'internet-facing',
+                'State': {'Code': state}
+            }]}
+        self.mock_elb_client.describe_load_balancers.side_effect = [
+            described('provisioning'),
+            described('active')
+        ]
+        
+        with patch('modules._backoff.time.sleep'):
+            result = self.manager.create_load_balancer(self.alb_name, ['sg-12345'], ['subnet-1'])
+        
+        self.assertTrue(result['Exists'])
+        self.assertEqual(self.mock_elb_client.describe_load_balancers.call_count, 2)
+        self.mock_elb_client.create_load_balancer.assert_not_called()
+    
+    def test_create_load_balancer_duplicate_gone(self):
+        """Test that a duplicate deleted before the lookup re-raises the error."""
+        self.mock_elb_client.describe_load_balancers.side_effect = _LB_NOT_FOUND
+        self.mock_elb_client.create_load_balancer.side_effect = ClientError(
+            {'Error': {'Code': 'DuplicateLoadBalancer'}}, 'CreateLoadBalancer'
+        )
+        
+        with self.assertRaises(ClientError) as ctx:
+            self.manager.create_load_balancer(self.alb_name, ['sg-12345'], ['subnet-1'])
+        self.assertEqual(ctx.exception.response['Error']['Code'], 'DuplicateLoadBalancer')
+    
+    def test_register_targets_retries_invalid_target(self):
+        """Test that a not-yet-eligible instance is retried until it registers."""
+        self.mock_elb_client.register_targets.side_effect = [
+            ClientError({'Error': {'Code': 'InvalidTarget'}}, 'RegisterTargets'),
+            {}
+        ]
+        
+        with patch('modules._backoff.time.sleep') as mock_sleep:
+            result = self.manager.register_targets('tg-arn', ['i-12345'])
+        
+        self.assertTrue(result)
+        self.assertEqual(self.mock_elb_client.register_targets.call_count, 2)
+        mock_sleep.assert_called_once()
+    
+    def test_register_targets_other_error(self):
+        """Test that other registration errors fail without retrying."""
+        self.mock_elb_client.register_targets.side_effect = ClientError(
+            {'Error': {'Code': 'AccessDenied'}}, 'RegisterTargets'
+        )
+        
+        with patch('modules._backoff.time.sleep') as mock_sleep:
+            result = self.manager.register_targets('tg-arn', ['i-12345'])
+        
+        self.assertFalse(result)
+        mock_sleep.assert_not_called()
+    
+    def test_register_targets_single_batch(self):
+        """Test that all instances are registered in one call, up to the limit."""
+        instance_ids = [f'i-{n:05d}' for n in range(3)]
+        
+        self.assertTrue(self.manager.register_targets('tg-arn', instance_ids))
+        self.mock_elb_client.register_targets.assert_called_once_with(
+            TargetGroupArn='tg-arn',
+            Targets=[{'Id': instance_id} for instance_id in instance_ids]
+        )
+        
+        with self.assertRaises(ValueError):
+            self.manager.register_targets('tg-arn', ['i-12345'] * 1001)
+    
+    def test_wait_active_returns_active_load_balancer(self):
+        """Test that waiting polls until the load balancer is active."""
+        self.mock_elb_client.describe_load_balancers.side_effect = [
+            {'LoadBalancers': [{'State': {'Code': 'provisioning'}}]},
+            {'LoadBalancers': [{'State': {'Code': 'active'}, 'DNSName': 'alb.example'}]}
+        ]
+        
+        with patch('modules._backoff.time.sleep') as mock_sleep:
+            lb = self.manager.wait_active('lb-arn')
+        
+        self.assertEqual(lb['DNSName'], 'alb.example')
+        mock_sleep.assert_called_once()
+    
+    def test_wait_active_failed_load_balancer(self):
+        """Test that a failed load balancer stops the wait."""
+        self.mock_elb_client.describe_load_balancers.return_value = {
+            'LoadBalancers': [{'State': {'Code': 'failed'}}]
+        }
+        
+        with patch('modules._backoff.time.sleep') as mock_sleep, \
+             self.assertRaises(Exception):
+            self.manager.wait_active('lb-arn')
+        mock_sleep.assert_not_called()
+    
+    def test_wait_active_default_timeout(self):
+        """Test that waiting keeps the stock waiter's 600-second ceiling."""
+        with patch('modules.alb.wait_until') as mock_wait:
+            self.manager.wait_active('lb-arn')
+        
+        self.assertEqual(mock_wait.call_args.kwargs['timeout'], 600)
+
+
+class _FakeClock:
+    """Monotonic clock that only advances when slept on."""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    
+    def monotonic(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestBackoff(unittest.TestCase):
+    """Test exponential-backoff polling."""
+    
+    def setUp(self):
+        """Drive the backoff module from a fake clock."""
+        self.clock = _FakeClock()
+        for name in ('monotonic', 'sleep'):
+            patcher = patch(f'modules._backoff.time.{name}', getattr(self.clock, name))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def test_backoff_delays_grow_and_cap(self):
+        """Test that delays grow by the factor up to the cap."""
+        delays = list(itertools.islice(backoff_delays(initial=1.0, factor=2.0, max_delay=5.0), 5))
+        
+        self.assertEqual(delays, [1.0, 2.0, 4.0, 5.0, 5.0])
+    
+    def test_immediate_success(self):
+        """Test that a settled resource returns without sleeping."""
+        self.assertEqual(wait_until(lambda: 'done', 'test'), 'done')
+        self.assertEqual(self.clock.sleeps, [])
+    
+    def test_backs_off_between_polls(self):
+        """Test that successive polls back off exponentially."""
+        check = Mock(side_effect=[None, None, None, 'done'])
+        
+        result = wait_until(check, 'test', initial=1.0, factor=2.0)
+        
+        self.assertEqual(result, 'done')
+        self.assertEqual(self.clock.sleeps, [1.0, 2.0, 4.0])
+    
+    def test_timeout(self):
+        """Test that the wait gives up once the timeout elapses."""
+        with self.assertRaises(TimeoutError):
+            wait_until(lambda: None, 'test', timeout=10, initial=1.0, factor=2.0)
+        
+        self.assertEqual(self.clock.now, 10)
+        self.assertEqual(self.clock.sleeps[-1], 3.0)
+    
+    def test_throttling_retried(self):
+        """Test that throttling errors are retried."""
+        check = Mock(side_effect=[
+            ClientError({'Error': {'Code': 'RequestLimitExceeded'}}, 'Describe'),
+            'done'
+        ])
+        
+        self.assertEqual(wait_until(check, 'test'), 'done')
+    
+    def test_non_retryable_error_raised(self):
+        """Test that other errors are re-raised immediately."""
+        check = Mock(side_effect=ClientError({'Error': {'Code': 'AccessDenied'}}, 'Describe'))
+        
+        with self.assertRaises(ClientError):
+            wait_until(check, 'test')
+        check.assert_called_once()
+    
+    def test_not_found_only_retried_during_grace(self):
+        """Test that not-found errors are only retried for the grace period."""
+        check = Mock(side_effect=ClientError({'Error': {'Code': 'NotFound'}}, 'Describe'))
+        
+        with self.assertRaises(ClientError):
+            wait_until(
+                check, 'test',
+                not_found_codes=frozenset({'NotFound'}),
+                not_found_grace=5,
+                initial=1.0, factor=1.0
+            )
+        
+        self.assertEqual(self.clock.now, 5)
+
+
+class TestJSONFileCache(unittest.TestCase):
+    """Test the on-disk TTL cache."""
+    
+    def setUp(self):
+        """Set up a temporary cache file path."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, 'cache', 'amis.json')
+    
+    def test_set_and_get(self):
+        """Test that values round-trip through the file until they expire."""
+        cache = _aws_cache.JSONFileCache(self.path, ttl=60)
+        
+        with patch('modules._aws_cache.time.time', return_value=1000):
+            cache.set('key', 'ami-12345')
+            self.assertEqual(cache.get('key'), 'ami-12345')
+        with patch('modules._aws_cache.time.time', return_value=1061):
+            self.assertIsNone(cache.get('key'))
+    
+    def test_corrupt_file_is_a_miss(self):
+        """Test that an unreadable cache file is treated as empty."""
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        
+        self.assertIsNone(_aws_cache.JSONFileCache(self.path, ttl=60).get('key'))
+    
+    def test_clear(self):
+        """Test that clearing removes the file."""
+        cache = _aws_cache.JSONFileCache(self.path, ttl=60)
+        cache.set('key', 'value')
+        
+        cache.clear()
+        cache.clear()
+        
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TestTTLCache(unittest.TestCase):
+    """Test the describe-result TTL cache."""
+    
+    def test_entries_expire(self):
+        """Test that entries are recomputed once their TTL elapses."""
+        cache = _aws_cache.TTLCache(ttl=60)
+        factory = Mock(side_effect=['vpc-1', 'vpc-2'])
+        
+        with patch('modules._aws_cache.time.monotonic', return_value=0):
+            self.assertEqual(cache.get_or_set('key', factory), 'vpc-1')
+            self.assertEqual(cache.get_or_set('key', factory), 'vpc-1')
+        with patch('modules._aws_cache.time.monotonic', return_value=61):
+            self.assertEqual(cache.get_or_set('key', factory), 'vpc-2')
+        
+        self.assertEqual(factory.call_count, 2)
+    
+    def test_failures_not_cached(self):
+        """Test that a failing lookup is retried on the next call."""
+        cache = _aws_cache.TTLCache(ttl=60)
+        factory = Mock(side_effect=[Exception("No default VPC found"), 'vpc-1'])
+        
+        with self.assertRaises(Exception):
+            cache.get_or_set('key', factory)
+        self.assertEqual(cache.get_or_set('key', factory), 'vpc-1')
+    
+    def test_default_vpc_shared_between_managers(self):
+        """Test that the default VPC is described once per region."""
+        _aws_cache.invalidate()
+        mock_ec2_client = Mock()
+        mock_ec2_client.describe_vpcs.return_value = {'Vpcs': [{'VpcId': 'vpc-12345'}]}
+        
+        alb_vpc = ALBManager(Mock(), mock_ec2_client)._get_default_vpc()
+        sg_vpc = SecurityGroupManager(mock_ec2_client)._get_default_vpc()
+        
+        self.assertEqual(alb_vpc, sg_vpc)
+        mock_ec2_client.describe_vpcs.assert_called_once()
+    
+    def test_default_vpc_shared_between_clients(self):
+        """Test that separately built clients of one region share the lookup."""
+        _aws_cache.invalidate()
+        first, second = Mock(), Mock()
+        for client in (first, second):
+            client.meta.region_name = 'us-east-1'
+            client.describe_vpcs.return_value = {'Vpcs': [{'VpcId': 'vpc-12345'}]}
+        
+        self.assertEqual(_aws_cache.default_vpc_id(first), 'vpc-12345')
+        self.assertEqual(SecurityGroupManager(second)._get_default_vpc(), 'vpc-12345')
+        second.describe_vpcs.assert_not_called()
+
+
+class TestAWSClients(unittest.TestCase):
+    """Test shared client construction."""
+    
+    def test_client_config(self):
+        """Test that the shared config pools and keeps connections alive."""
+        config = get_client_config()
+        
+        self.assertIs(config, get_client_config())
+        self.assertEqual(config.max_pool_connections, 50)
+        self.assertTrue(config.tcp_keepalive)
+        self.assertEqual(config.retries['mode'], 'adaptive')
+    
+    def test_make_clients_uses_shared_config(self):
+        """Test that clients are built from one session with the shared config."""
+        mock_session = Mock()
+        
+        clients = make_clients('us-east-1', session=mock_session)
+        
+        self.assertEqual(set(clients), {'ec2', 'elbv2'})
+        for call in mock_session.client.call_args_list:
+            self.assertIs(call[1]['config'], get_client_config())
+            self.assertEqual(call[1]['region_name'], 'us-east-1')
+    
+    def test_managers_have_no_instance_dict(self):
+        """Test that the managers store their clients in slots."""
+        managers = [
+            KeyPairManager(Mock()),
+            SecurityGroupManager(Mock()),
+            EC2InstanceManager(Mock()),
+            ALBManager(Mock(), Mock())
+        ]
+        
+        for manager in managers:
+            self.assertFalse(hasattr(manager, '__dict__'), type(manager).__name__)
 
 
 if __name__ == "__main__":
@@ -2,83 +2,130 @@
 Unit tests for utility functions.
 """
 
+import contextlib
+import io
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, Mock
+from botocore.exceptions import ClientError
 from utils.helpers import (
     get_my_public_ip,
+    aws_retry,
+    MAX_RETRY_ATTEMPTS,
+    save_state,
+    load_state,
+    clear_state,
     print_section,
     print_resource_info,
     print_error,
     print_success,
-    wait_with_progress
+    wait_with_progress,
+    format_tags,
+    _fetch_public_ip
 )
 
 
 class TestUtilityFunctions(unittest.TestCase):
     """Test utility helper functions."""
     
-    @patch('requests.get')
-    def test_get_my_public_ip_success(self, mock_get):
+    @classmethod
+    def setUpClass(cls):
+        """Build the checkip response shared by the public IP tests."""
+        cls.ok_response = Mock(text="203.0.113.1\n", status_code=200)
+    
+    def setUp(self):
+        """Forget any public IP cached by an earlier test."""
+        _fetch_public_ip.cache_clear()
+        self.addCleanup(_fetch_public_ip.cache_clear)
+    
+    @patch('utils.helpers._http_session')
+    def test_get_my_public_ip_success(self, mock_http_session):
         """Test successful public IP retrieval."""
-        mock_response = Mock()
-        mock_response.text = "203.0.113.1"
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        mock_get = mock_http_session.return_value.get
+        mock_get.return_value = self.ok_response
         
         ip = get_my_public_ip()
         
         self.assertEqual(ip, "203.0.113.1")
         mock_get.assert_called_once()
     
-    @patch('utils.helpers.requests')
-    def test_get_my_public_ip_failure(self, mock_requests):
+    @patch('utils.helpers._http_session')
+    def test_get_my_public_ip_failure(self, mock_http_session):
         """Test public IP retrieval failure."""
-        import requests as real_requests
-        # Make RequestException available
-        mock_requests.RequestException = real_requests.RequestException
-        mock_requests.get.side_effect = real_requests.RequestException("Network error")
+        import requests
+        mock_http_session.return_value.get.side_effect = requests.RequestException("Network error")
         
         ip = get_my_public_ip()
         
         self.assertIsNone(ip)
     
-    @patch('builtins.print')
-    def test_print_section(self, mock_print):
+    @patch('utils.helpers._http_session')
+    def test_get_my_public_ip_cached_after_success(self, mock_http_session):
+        """Test that the IP is fetched once, and a failure is not cached."""
+        import requests
+        mock_get = mock_http_session.return_value.get
+        mock_get.side_effect = [
+            requests.RequestException("Network error"),
+            self.ok_response
+        ]
+        
+        self.assertIsNone(get_my_public_ip())
+        self.assertEqual(get_my_public_ip(), "203.0.113.1")
+        self.assertEqual(get_my_public_ip(), "203.0.113.1")
+        self.assertEqual(mock_get.call_count, 2)
+    
+    def test_http_session_reused(self):
+        """Test that one HTTP session is built and then reused."""
+        from utils.helpers import _http_session
+        
+        self.assertIs(_http_session(), _http_session())
+    
+    def test_format_tags(self):
+        """Test that tags are copied down to their Key and Value."""
+        tags = [{'Key': 'Project', 'Value': 'demo', 'Extra': 1}]
+        
+        formatted = format_tags(tags)
+        
+        self.assertEqual(formatted, [{'Key': 'Project', 'Value': 'demo'}])
+        self.assertIsNot(formatted[0], tags[0])
+    
+    def test_print_section(self):
         """Test print_section function."""
-        print_section("Test Section")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            print_section("Test Section")
         
-        # Verify print was called
-        self.assertTrue(mock_print.called)
-        # Check that the section title is in one of the calls
-        call_args = [str(call[0]) for call in mock_print.call_args_list]
-        self.assertTrue(any("Test Section" in arg for arg in call_args))
+        # Check that the section title is printed
+        self.assertIn("Test Section", output.getvalue())
     
-    @patch('builtins.print')
-    def test_print_resource_info(self, mock_print):
+    def test_print_resource_info(self):
         """Test print_resource_info function."""
-        print_resource_info("Resource", "resource-name", "resource-id-123")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            print_resource_info("Resource", "resource-name", "resource-id-123")
         
-        self.assertTrue(mock_print.called)
+        self.assertEqual(output.getvalue(), "✓ Resource: resource-name\n  ID: resource-id-123\n")
     
-    @patch('builtins.print')
-    def test_print_error(self, mock_print):
+    def test_print_error(self):
         """Test print_error function."""
-        print_error("Test error message")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            print_error("Test error message")
         
-        self.assertTrue(mock_print.called)
-        # Verify error symbol or message appears
-        call_args = [str(call[0]) for call in mock_print.call_args_list]
-        self.assertTrue(any("error" in arg.lower() or "✗" in arg for arg in call_args))
+        # Verify error symbol and message appear
+        self.assertIn("✗", output.getvalue())
+        self.assertIn("Test error message", output.getvalue())
     
-    @patch('builtins.print')
-    def test_print_success(self, mock_print):
+    def test_print_success(self):
         """Test print_success function."""
-        print_success("Test success message")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            print_success("Test success message")
         
-        self.assertTrue(mock_print.called)
-        # Verify success symbol or message appears
-        call_args = [str(call[0]) for call in mock_print.call_args_list]
-        self.assertTrue(any("success" in arg.lower() or "✓" in arg for arg in call_args))
+        # Verify success symbol and message appear
+        self.assertIn("✓", output.getvalue())
+        self.assertIn("Test success message", output.getvalue())
     
     @patch('time.sleep')
     @patch('builtins.print')
@@ -90,6 +137,113 @@ class TestUtilityFunctions(unittest.TestCase):
         self.assertTrue(mock_sleep.called)
         # Verify print was called
         self.assertTrue(mock_print.called)
+    
+    @patch('time.sleep')
+    @patch('builtins.print')
+    def test_wait_with_progress_granularity(self, mock_print, mock_sleep):
+        """Test that the wait sleeps once, or once per granularity step."""
+        wait_with_progress("Testing", 30)
+        mock_sleep.assert_called_once_with(30)
+        
+        mock_sleep.reset_mock()
+        wait_with_progress("Testing", 12, granularity=5)
+        self.assertEqual([c[0][0] for c in mock_sleep.call_args_list], [5, 5, 2])
+    
+    @patch('time.sleep')
+    def test_wait_with_progress_rejects_bad_granularity(self, mock_sleep):
+        """Test that a zero or negative granularity is rejected up front."""
+        for granularity in (0, -1):
+            with self.subTest(granularity=granularity), self.assertRaises(ValueError):
+                wait_with_progress("Testing", 10, granularity=granularity)
+        
+        mock_sleep.assert_not_called()
+
+
+class TestAwsRetry(unittest.TestCase):
+    """Test the throttling retry decorator."""
+    
+    @patch('utils.helpers.time.sleep')
+    def test_retries_throttled_call(self, mock_sleep):
+        """Test that throttling errors are retried until the call succeeds."""
+        throttled = ClientError({'Error': {'Code': 'Throttling'}}, 'DescribeInstances')
+        fn = Mock(side_effect=[throttled, throttled, 'ok'])
+        
+        result = aws_retry(fn)(InstanceIds=['i-12345'])
+        
+        self.assertEqual(result, 'ok')
+        self.assertEqual(fn.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+    
+    @patch('utils.helpers.time.sleep')
+    def test_gives_up_after_max_attempts(self, mock_sleep):
+        """Test that a persistently throttled call eventually raises."""
+        fn = Mock(side_effect=ClientError(
+            {'Error': {'Code': 'RequestLimitExceeded'}}, 'DescribeInstances'
+        ))
+        
+        with self.assertRaises(ClientError):
+            aws_retry(fn)()
+        
+        self.assertEqual(fn.call_count, MAX_RETRY_ATTEMPTS)
+    
+    @patch('utils.helpers.time.sleep')
+    def test_other_errors_not_retried(self, mock_sleep):
+        """Test that non-throttling errors are raised immediately."""
+        fn = Mock(side_effect=ClientError(
+            {'Error': {'Code': 'InvalidGroup.NotFound'}}, 'DeleteSecurityGroup'
+        ))
+        
+        with self.assertRaises(ClientError):
+            aws_retry(fn)()
+        
+        fn.assert_called_once()
+        mock_sleep.assert_not_called()
+
+
+class TestDeploymentState(unittest.TestCase):
+    """Test the deployment state file helpers."""
+    
+    def setUp(self):
+        """Set up a temporary state file path."""
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, "state.json")
+    
+    def test_save_and_load_state(self):
+        """Test that saved state round-trips without the private key."""
+        resources = {
+            "key_pair": {"KeyName": "test-key", "KeyMaterial": "secret"},
+            "instance": {"InstanceId": "i-12345"}
+        }
+        
+        save_state(resources, self.path)
+        state = load_state(self.path)
+        
+        self.assertEqual(state["instance"]["InstanceId"], "i-12345")
+        self.assertEqual(state["key_pair"], {"KeyName": "test-key"})
+        self.assertIn("KeyMaterial", resources["key_pair"])
+        with open(self.path) as f:
+            self.assertNotIn("secret", f.read())
+    
+    def test_load_missing_state(self):
+        """Test that a missing state file yields an empty state."""
+        self.assertEqual(load_state(self.path), {})
+    
+    def test_load_corrupt_state(self):
+        """Test that an unreadable state file yields an empty state."""
+        with open(self.path, 'w') as f:
+            f.write("{not json")
+        
+        self.assertEqual(load_state(self.path), {})
+    
+    def test_clear_state(self):
+        """Test that the state file is removed, and a missing one is ignored."""
+        save_state({"instance": {"InstanceId": "i-12345"}}, self.path)
+        
+        clear_state(self.path)
+        clear_state(self.path)
+        
+        self.assertFalse(os.path.exists(self.path))
 
 
 class TestUtilityInputValidation(unittest.TestCase):
@@ -115,10 +269,8 @@ class TestUtilityInputValidation(unittest.TestCase):
         test_inputs = ["string error", 123, None, {"error": "dict"}]
         
         for test_input in test_inputs:
-            try:
+            with self.subTest(value=test_input):
                 print_error(test_input)
-            except Exception as e:
-                self.fail(f"print_error raised {e} for input {test_input}")
 
 
 if __name__ == "__main__":
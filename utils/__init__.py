@@ -4,7 +4,12 @@ Utility package initialization.
 
 from .helpers import (
     get_my_public_ip,
+    aws_retry,
+    save_state,
+    load_state,
+    clear_state,
     format_tags,
+    format_section,
     print_section,
     print_resource_info,
     print_error,
@@ -14,7 +19,12 @@ from .helpers import (
 
 __all__ = [
     'get_my_public_ip',
+    'aws_retry',
+    'save_state',
+    'load_state',
+    'clear_state',
     'format_tags',
+    'format_section',
     'print_section',
     'print_resource_info',
     'print_error',
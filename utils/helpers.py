@@ -2,31 +2,162 @@
 Helper utilities for AWS operations.
 """
 
-import requests
-from typing import Optional
+import functools
+import json
+import os
+import random
+import time
+from operator import itemgetter
+from typing import Any, Callable, Dict, Optional
 import logging
+from botocore.exceptions import ClientError
+
+from modules._backoff import THROTTLING_CODES
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of attempts for a throttled AWS call
+MAX_RETRY_ATTEMPTS = 6
+
+# Pulls the (Key, Value) pair out of a tag dictionary
+_tag_items = itemgetter("Key", "Value")
+
+
+@functools.lru_cache(maxsize=1)
+def _http_session():
+    """
+    Get the HTTP session shared by outbound requests, built on first use.
+    
+    Reusing one session keeps the connection (and its TLS session) alive
+    between calls instead of reconnecting each time.
+    
+    Returns:
+        requests.Session: Shared session
+    """
+    # Imported here: requests is the slowest import in the CLI start-up path
+    import requests
+    from requests.adapters import HTTPAdapter
+    
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+    return session
+
+
+@functools.lru_cache(maxsize=1)
+def _fetch_public_ip() -> str:
+    """
+    Fetch the public IP address, once per process.
+    
+    A failed lookup raises, and so is not cached and retried next call.
+    
+    Returns:
+        str: Public IP address
+    """
+    response = _http_session().get('https://checkip.amazonaws.com', timeout=5)
+    response.raise_for_status()
+    ip = response.text.strip()
+    logger.info(f"Retrieved public IP: {ip}")
+    return ip
+
 
 def get_my_public_ip() -> Optional[str]:
     """
     Get the public IP address of the machine running this script.
     
+    The address is looked up once and reused for the rest of the run.
+    
     Returns:
         str: Public IP address or None if unable to retrieve
     """
+    import requests
+    
     try:
-        response = requests.get('https://checkip.amazonaws.com', timeout=5)
-        response.raise_for_status()
-        ip = response.text.strip()
-        logger.info(f"Retrieved public IP: {ip}")
-        return ip
+        return _fetch_public_ip()
     except requests.RequestException as e:
         logger.error(f"Failed to retrieve public IP: {e}")
         return None
 
 
+def aws_retry(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Retry an AWS call with exponential backoff and jitter when throttled.
+    
+    Args:
+        fn: Callable that issues an AWS API request
+        
+    Returns:
+        Callable: Wrapped callable that retries on throttling errors
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(MAX_RETRY_ATTEMPTS):
+            try:
+                return fn(*args, **kwargs)
+            except ClientError as e:
+                code = e.response.get('Error', {}).get('Code')
+                if code not in THROTTLING_CODES or attempt == MAX_RETRY_ATTEMPTS - 1:
+                    raise
+                delay = min(30, 0.5 * 2 ** attempt + random.uniform(0, 0.5))
+                logger.warning(f"Request throttled ({code}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+    
+    return wrapper
+
+
+def save_state(resources: Dict[str, Any], path: str) -> None:
+    """
+    Save deployed resource information to a local state file.
+    
+    The private key material is never written to the state file.
+    
+    Args:
+        resources: Deployed resource information
+        path: Path of the state file
+    """
+    state = dict(resources)
+    if "key_pair" in state:
+        state["key_pair"] = {
+            key: value for key, value in state["key_pair"].items()
+            if key != "KeyMaterial"
+        }
+    
+    with open(path, 'w') as f:
+        json.dump(state, f, indent=2)
+    logger.info(f"Saved deployment state to: {path}")
+
+
+def load_state(path: str) -> Dict[str, Any]:
+    """
+    Load deployed resource information from a local state file.
+    
+    Args:
+        path: Path of the state file
+        
+    Returns:
+        dict: Saved resource information, or an empty dict if unavailable
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.info(f"No usable deployment state at {path}: {e}")
+        return {}
+
+
+def clear_state(path: str) -> None:
+    """
+    Remove the local state file once its resources are gone.
+    
+    Args:
+        path: Path of the state file
+    """
+    try:
+        os.remove(path)
+        logger.info(f"Removed deployment state: {path}")
+    except FileNotFoundError:
+        pass
+
+
 def format_tags(tags: list) -> list:
     """
     Format tags for AWS resources.
@@ -37,7 +168,28 @@ def format_tags(tags: list) -> list:
     Returns:
         list: Formatted tags
     """
-    return [{"Key": tag["Key"], "Value": tag["Value"]} for tag in tags]
+    return [{"Key": key, "Value": value} for key, value in map(_tag_items, tags)]
+
+
+@functools.lru_cache(maxsize=8)
+def _separator(width: int) -> str:
+    """Get the section separator line for a width."""
+    return "=" * width
+
+
+def format_section(title: str, width: int = 60) -> str:
+    """
+    Format a section header.
+    
+    Args:
+        title: Section title
+        width: Width of the separator line
+        
+    Returns:
+        str: Section header, starting with a blank line
+    """
+    separator = _separator(width)
+    return "\n".join(("", separator, f"  {title}", separator))
 
 
 def print_section(title: str, width: int = 60) -> None:
@@ -48,9 +200,7 @@ def print_section(title: str, width: int = 60) -> None:
         title: Section title
         width: Width of the separator line
     """
-    print("\n" + "=" * width)
-    print(f"  {title}")
-    print("=" * width)
+    print(format_section(title, width))
 
 
 def print_resource_info(resource_type: str, resource_name: str, resource_id: str) -> None:
@@ -62,8 +212,7 @@ def print_resource_info(resource_type: str, resource_name: str, resource_id: str
         resource_name: Name of the resource
         resource_id: AWS resource ID
     """
-    print(f"✓ {resource_type}: {resource_name}")
-    print(f"  ID: {resource_id}")
+    print(f"✓ {resource_type}: {resource_name}\n  ID: {resource_id}")
 
 
 def print_error(message: str) -> None:
@@ -86,19 +235,31 @@ def print_success(message: str) -> None:
     print(f"✓ {message}")
 
 
-def wait_with_progress(message: str, seconds: int = 30) -> None:
+def wait_with_progress(
+    message: str,
+    seconds: int = 30,
+    granularity: Optional[float] = None
+) -> None:
     """
     Display a waiting message with progress indicator.
     
     Args:
         message: Message to display
         seconds: Number of seconds to wait
+        granularity: Seconds between progress dots (one sleep if None)
+    
+    Raises:
+        ValueError: If granularity is not positive
     """
-    import time
-    import sys
+    if granularity is not None and granularity <= 0:
+        raise ValueError(f"granularity must be positive, got {granularity}")
+    step = seconds if granularity is None else granularity
     
     print(f"\n{message}", end="", flush=True)
-    for i in range(seconds):
-        time.sleep(1)
+    remaining = seconds
+    while remaining > 0:
+        delay = min(step, remaining)
+        time.sleep(delay)
+        remaining -= delay
         print(".", end="", flush=True)
     print(" Done!")